@@ -5,6 +5,18 @@ setup_project_path()
 # --- Import Management ---
 from src.imports import *
 from src.imports import setup_logging, setup_streamlit_config, setup_asyncio
+from src.ui.dashboard_components import (
+    get_cached_tickers,
+    render_cex_price_comparison,
+    render_free_api_comparison,
+    render_risk_monitoring_panel,
+    render_batch_monitoring_panel
+)
+from src.ui.monitoring_components import (
+    render_exchange_health_monitor,
+    render_cross_chain_analysis,
+    render_enhanced_ccxt_features
+)
 
 # --- Setup Configuration ---
 logger = setup_logging()
@@ -12,17 +24,6 @@ setup_streamlit_config()
 setup_asyncio()
 
 # --- Helper Functions ---
-def safe_run_async(coro):
-    """Safely runs an async coroutine, handling nested event loops."""
-    try:
-        return asyncio.run(coro)
-    except RuntimeError as e:
-        if "cannot run loop while another loop is running" in str(e):
-            # This is expected in Streamlit's environment with nest_asyncio
-            return asyncio.run(coro)
-        st.error(f"异步操作失败: {e}")
-        return None
-
 def _validate_symbol(symbol: str) -> bool:
     """Validates that the symbol is not empty and has a valid format."""
     if not symbol or '/' not in symbol or len(symbol.split('/')) != 2:
@@ -30,20 +31,69 @@ def _validate_symbol(symbol: str) -> bool:
         return False
     return True
 
-def _create_depth_chart(order_book: dict) -> go.Figure:
-    """Creates a Plotly order book depth chart."""
-    bids = pd.DataFrame(order_book.get('bids', []), columns=['price', 'volume']).astype(float)
-    asks = pd.DataFrame(order_book.get('asks', []), columns=['price', 'volume']).astype(float)
-    bids = bids.sort_values('price', ascending=False)
-    asks = asks.sort_values('price', ascending=True)
-    bids['cumulative'] = bids['volume'].cumsum()
-    asks['cumulative'] = asks['volume'].cumsum()
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=bids['price'], y=bids['cumulative'], name='买单', fill='tozeroy', line_color='green'))
-    fig.add_trace(go.Scatter(x=asks['price'], y=asks['cumulative'], name='卖单', fill='tozeroy', line_color='red'))
-    fig.update_layout(title_text=f"{order_book.get('symbol', '')} 市场深度", xaxis_title="价格", yaxis_title="累计数量", height=300, margin=dict(l=20, r=20, t=40, b=20))
+DEPTH_LIMIT = 50
+DEPTH_TIMEOUT_SECONDS = 5
+
+def _sorted_levels(levels: list, descending: bool) -> np.ndarray:
+    """Converts [price, volume, ...] levels into an (N, 2) float64 array sorted by price."""
+    arr = order_book_levels(levels)
+    order = np.argsort(-arr[:, 0] if descending else arr[:, 0], kind='stable')
+    return arr[order]
+
+def _depth_series(order_book: dict) -> tuple:
+    """Returns (bid prices, cumulative bids, ask prices, cumulative asks) for one order book."""
+    bids = _sorted_levels(order_book.get('bids', []), descending=True)
+    asks = _sorted_levels(order_book.get('asks', []), descending=False)
+    return bids[:, 0], np.cumsum(bids[:, 1]), asks[:, 0], np.cumsum(asks[:, 1])
+
+def _new_depth_figure(exchanges: tuple) -> go.Figure:
+    """Creates an empty depth figure with one bid/ask trace pair per exchange."""
+    if len(exchanges) == 1:
+        fig = go.Figure()
+        fig.update_layout(xaxis_title="价格", margin=dict(l=20, r=20, t=40, b=20))
+    else:
+        fig = make_subplots(rows=1, cols=len(exchanges), subplot_titles=list(exchanges))
+        fig.update_layout(margin=dict(l=20, r=20, t=60, b=20))
+    for col in range(1, len(exchanges) + 1):
+        traces = [
+            go.Scattergl(name='买单', fill='tozeroy', line_color='green', showlegend=col == 1),
+            go.Scattergl(name='卖单', fill='tozeroy', line_color='red', showlegend=col == 1),
+        ]
+        for trace in traces:
+            if len(exchanges) == 1:
+                fig.add_trace(trace)
+            else:
+                fig.add_trace(trace, row=1, col=col)
+    fig.update_layout(yaxis_title="累计数量", height=300)
     return fig
 
+def _get_depth_figure(exchanges: tuple) -> go.Figure:
+    """
+    Returns the depth figure kept in session state, creating it when the set of
+    exchanges changes. Reusing the figure means later queries only swap trace data.
+    """
+    if st.session_state.get('depth_fig_exchanges') != exchanges:
+        st.session_state.depth_fig = _new_depth_figure(exchanges)
+        st.session_state.depth_fig_exchanges = exchanges
+    return st.session_state.depth_fig
+
+def _update_depth_figure(fig: go.Figure, order_books: Dict[str, dict], symbol: str) -> go.Figure:
+    """Replaces the trace data of a depth figure in a single batched update."""
+    with fig.batch_update():
+        for i, order_book in enumerate(order_books.values()):
+            bid_px, bid_cum, ask_px, ask_cum = _depth_series(order_book)
+            fig.data[2 * i].update(x=bid_px, y=bid_cum)
+            fig.data[2 * i + 1].update(x=ask_px, y=ask_cum)
+        fig.layout.title.text = f"{symbol} 市场深度"
+    return fig
+
+async def _fetch_order_books(providers: List[BaseProvider], symbol: str) -> list:
+    """Fetches order books from all providers concurrently, bounding each by a timeout."""
+    return await asyncio.gather(
+        *[asyncio.wait_for(p.get_order_book(symbol, limit=DEPTH_LIMIT), DEPTH_TIMEOUT_SECONDS) for p in providers],
+        return_exceptions=True,
+    )
+
 def _create_candlestick_chart(df: pd.DataFrame, symbol: str, show_volume: bool = True, ma_periods: list = None) -> go.Figure:
     """Creates a Plotly candlestick chart from OHLCV data with optional indicators."""
     if df.empty:
@@ -131,25 +181,52 @@ def get_db_manager(db_path: str):
     """Creates and caches the database manager."""
     if not db_path: return None
     db_manager = DatabaseManager(db_path)
+
+    async def _boot():
+        # init_db needs the connection, so both steps run in one coroutine on the shared loop.
+        await db_manager.__aenter__()
+        await db_manager.init_db()
+
     try:
-        asyncio.run(db_manager.__aenter__())
-        asyncio.run(db_manager.init_db())
+        run_async(_boot())
         return db_manager
     except Exception as e:
         st.error(f"连接或初始化SQLite数据库时失败: {e}")
-        asyncio.run(db_manager.__aexit__(None, None, None))
+        run_async(db_manager.__aexit__(None, None, None))
         return None
 
+def _freeze_api_keys(api_keys: Dict[str, Dict[str, str]]) -> tuple:
+    """Converts a nested API-key mapping into a hashable, order-independent tuple."""
+    return tuple(sorted((ex_id, tuple(sorted(keys.items()))) for ex_id, keys in api_keys.items()))
+
+@functools.lru_cache(maxsize=8)
+def _merge_api_keys(file_keys: tuple, ui_keys: tuple) -> Dict[str, Dict[str, str]]:
+    """Merges frozen config-file and UI API keys (UI keys win). The result is shared, so do not mutate it."""
+    return {ex_id: dict(keys) for ex_id, keys in file_keys + ui_keys}
+
+def _hash_api_keys(api_keys: Dict[str, Dict[str, str]]) -> str:
+    """Returns a stable digest of the session API keys for use as a cache key."""
+    return hashlib.md5(json.dumps(api_keys, sort_keys=True).encode()).hexdigest()
+
 @st.cache_resource
-def get_providers(_config: Dict, _session_state) -> List[BaseProvider]:
-    """Create and cache a list of all data providers."""
+def get_providers(_config: Dict, _api_keys: Dict, demo_mode: bool, selected_exchanges: tuple, api_keys_hash: str) -> List[BaseProvider]:
+    """
+    Create and cache a list of all data providers.
+
+    Only `demo_mode`, `selected_exchanges` and `api_keys_hash` form the cache
+    key, so unrelated widget changes do not recreate exchange connections.
+    """
     providers = []
-    is_demo_mode = not bool(_session_state.get('api_keys'))
-    provider_config = _config.copy()
-    provider_config['api_keys'] = {**_config.get('api_keys', {}), **_session_state.get('api_keys', {})}
-    for ex_id in _session_state.selected_exchanges:
+    # CEXProvider only reads 'api_keys', so avoid copying the full config on every rebuild
+    provider_config = {'api_keys': _merge_api_keys(
+        _freeze_api_keys(_config.get('api_keys', {})),
+        _freeze_api_keys(_api_keys)
+    )}
+    # Live exchanges share one HTTP session bound to the shared event loop
+    session = None if demo_mode else get_session(get_event_loop())
+    for ex_id in selected_exchanges:
         try:
-            providers.append(CEXProvider(name=ex_id, config=provider_config, force_mock=is_demo_mode))
+            providers.append(CEXProvider(name=ex_id, config=provider_config, force_mock=demo_mode, session=session))
         except ValueError as e:
             st.error(f"初始化 CEX 提供商 '{ex_id}' 失败: {e}", icon="🚨")
         except Exception as e:
@@ -166,9 +243,41 @@ def init_session_state(config):
         st.session_state.api_keys = {}
 
 # --- Dashboard UI ---
+def _run_auto_refreshing(render, *args):
+    """
+    Runs `render` as a fragment. While auto-refresh is enabled the fragment
+    reruns on its own every `auto_refresh_interval` seconds, so only that view
+    updates instead of the whole script sleeping and rerunning.
+    """
+    run_every = st.session_state.get('auto_refresh_interval', 10) if st.session_state.get('auto_refresh_enabled', False) else None
+    st.fragment(run_every=run_every)(render)(*args)
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _scan_ticker_snapshot(_engine: ArbitrageEngine, symbols: tuple, tickers: list) -> List[Opportunity]:
+    """Runs the arbitrage scan over a ticker snapshot; identical snapshots reuse the result."""
+    return _engine.scan_tickers(list(symbols), tickers)
+
+def _find_opportunities(engine: ArbitrageEngine) -> List[Opportunity]:
+    """
+    Finds opportunities from the ticker snapshot shared with the price table,
+    so the header, the leaderboard and the price table fetch tickers only once per TTL.
+    Whichever of them fetches a new snapshot also saves it to the database.
+    """
+    symbols = tuple(st.session_state.selected_symbols)
+    cex_providers = [p for p in engine.providers if isinstance(p, CEXProvider)]
+    db_manager = get_db_manager(get_config().get('sqlite_db_path'))
+    return _scan_ticker_snapshot(engine, symbols, get_cached_tickers(cex_providers, symbols, db_manager))
+
 def _render_dashboard_header(providers: List[BaseProvider], engine: ArbitrageEngine):
-    """Renders the main metric headers for the dashboard."""
+    """Renders the dashboard title and the auto-refreshing metric row."""
     st.title("🎯 专业套利交易系统")
+    _run_auto_refreshing(_render_dashboard_metrics, providers, engine)
+
+def _render_dashboard_metrics(providers: List[BaseProvider], engine: ArbitrageEngine):
+    """
+    Renders the main metric headers for the dashboard. Runs as its own fragment so
+    the opportunity metrics refresh together with the leaderboard below them.
+    """
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
         st.metric("连接交易所", len([p for p in providers if isinstance(p, CEXProvider)]))
@@ -177,20 +286,15 @@ def _render_dashboard_header(providers: List[BaseProvider], engine: ArbitrageEng
     with col3:
         demo_mode = not bool(st.session_state.get('api_keys'))
         st.metric("运行模式", "演示" if demo_mode else "实时")
-    
-    # Placeholders for metrics that require data
-    opp_placeholder = st.empty()
-    profit_placeholder = st.empty()
-    
+
     with st.spinner("正在计算实时指标..."):
-        opportunities = safe_run_async(engine.find_opportunities(st.session_state.selected_symbols)) if engine else []
+        opportunities = _find_opportunities(engine) if engine else []
         with col4:
             profitable_opps = len([opp for opp in opportunities if opp.get('profit_percentage', 0) > 0.1])
             st.metric("活跃机会", profitable_opps, delta=f"+{profitable_opps}" if profitable_opps > 0 else None)
         with col5:
             max_profit = max([opp.get('profit_percentage', 0) for opp in opportunities], default=0)
             st.metric("最高收益率", f"{max_profit:.3f}%", delta=f"+{max_profit:.3f}%" if max_profit > 0 else None)
-    return opportunities
 
 def _render_opportunity_leaderboard(engine: ArbitrageEngine, risk_manager: RiskManager):
     """Renders the main table of arbitrage opportunities."""
@@ -199,14 +303,14 @@ def _render_opportunity_leaderboard(engine: ArbitrageEngine, risk_manager: RiskM
 
     opp_placeholder = st.empty()
     with st.spinner("正在寻找套利机会..."):
-        opportunities = safe_run_async(engine.find_opportunities(st.session_state.selected_symbols))
+        opportunities = _find_opportunities(engine)
         filtered_opps = [opp for opp in opportunities if opp.get('profit_percentage', 0) >= min_profit_filter]
         
         if not filtered_opps:
             opp_placeholder.info(f"🔍 未发现收益率 ≥ {min_profit_filter}% 的套利机会")
             return
 
-        df = pd.DataFrame(filtered_opps).sort_values(by="profit_percentage", ascending=False)
+        df = pd.DataFrame.from_records(filtered_opps, columns=list(Opportunity.__annotations__)).sort_values(by="profit_percentage", ascending=False)
         opp_placeholder.dataframe(df, use_container_width=True, hide_index=True)
 
 def show_dashboard(engine: ArbitrageEngine, providers: List[BaseProvider]):
@@ -218,14 +322,14 @@ def show_dashboard(engine: ArbitrageEngine, providers: List[BaseProvider]):
     risk_manager = st.session_state.risk_manager
 
     # Render Header
-    opportunities = _render_dashboard_header(providers, engine)
+    _render_dashboard_header(providers, engine)
 
     # Render Main Content Tabs
     tab_titles = ["📈 实时套利机会", "📊 价格对比", "⚙️ 风险管理", "🧰 工具箱"]
     tab1, tab2, tab3, tab4 = st.tabs(tab_titles)
 
     with tab1:
-        _render_opportunity_leaderboard(engine, risk_manager)
+        _run_auto_refreshing(_render_opportunity_leaderboard, engine, risk_manager)
 
     with tab2:
         render_unified_price_comparison(providers)
@@ -285,26 +389,50 @@ def show_dashboard(engine: ArbitrageEngine, providers: List[BaseProvider]):
         else:
             st.error(f"🔴 亏损风险: 净收益率 {roi:.3f}%")
 
+def _render_cex_prices(providers: List[BaseProvider]):
+    """Renders the CEX price table; run as a fragment so refreshing it does not rerun the page."""
+    price_placeholder = st.empty()
+    db_manager = get_db_manager(get_config().get('sqlite_db_path'))
+    render_cex_price_comparison(providers, price_placeholder, db_manager)
+
+@st.fragment
+def show_depth_view(providers: List[BaseProvider]):
+    """Queries order books for the selected exchanges and draws their market depth."""
+    st.subheader("🌊 市场深度可视化")
+    depth_cols = st.columns(3)
+    cex_names = [p.name for p in providers if isinstance(p, CEXProvider)]
+    selected_exs = depth_cols[0].multiselect("选择交易所", options=cex_names, default=cex_names[:1], key="depth_exchange")
+    selected_sym = depth_cols[1].text_input("输入交易对", st.session_state.selected_symbols[0], key="depth_symbol")
+
+    if depth_cols[2].button("查询深度", key="depth_button"):
+        if _validate_symbol(selected_sym):
+            depth_providers = [p for p in providers if p.name in selected_exs]
+            if depth_providers:
+                with st.spinner(f"正在从 {len(depth_providers)} 个交易所获取 {selected_sym} 的订单簿..."):
+                    results = safe_run_async(_fetch_order_books(depth_providers, selected_sym)) or []
+                order_books = {}
+                for provider, order_book in zip(depth_providers, results):
+                    if isinstance(order_book, dict) and 'error' not in order_book:
+                        order_books[provider.name] = order_book
+                    else:
+                        error = order_book.get('error', '未知错误') if isinstance(order_book, dict) else (str(order_book) or type(order_book).__name__)
+                        display_error(f"无法获取 {provider.name} 的订单簿: {error}")
+                if order_books:
+                    fig = _update_depth_figure(_get_depth_figure(tuple(order_books)), order_books, selected_sym)
+                    st.plotly_chart(fig, width='stretch', key="order_book_depth_chart")
+
 def render_unified_price_comparison(providers: List[BaseProvider]):
     """
     Renders a unified price comparison UI that can switch between
     CEX providers (API key-based) and the Free API provider.
     """
-    from src.ui.dashboard_components import (
-        render_cex_price_comparison, 
-        render_free_api_comparison,
-        render_risk_monitoring_panel,
-        render_batch_monitoring_panel
-    )
-    
     st.markdown("---")
     st.subheader("📊 实时价格对比")
 
     data_source = st.selectbox("选择数据源", ["CEX (需要API密钥)", "免费API (8大交易所)"], key="price_source_selector")
 
     if data_source == "CEX (需要API密钥)":
-        price_placeholder = st.empty()
-        render_cex_price_comparison(providers, price_placeholder)
+        _run_auto_refreshing(_render_cex_prices, providers)
     elif data_source == "免费API (8大交易所)":
         render_free_api_comparison()
     
@@ -318,21 +446,11 @@ def render_unified_price_comparison(providers: List[BaseProvider]):
 
     st.markdown("---")
 
-    st.subheader("🌊 市场深度可视化")
-    depth_cols = st.columns(3)
-    selected_ex = depth_cols[0].selectbox("选择交易所", options=[p.name for p in providers if isinstance(p, CEXProvider)], key="depth_exchange")
-    selected_sym = depth_cols[1].text_input("输入交易对", st.session_state.selected_symbols[0], key="depth_symbol")
+    show_depth_view(providers)
 
-    if depth_cols[2].button("查询深度", key="depth_button"):
-        if _validate_symbol(selected_sym):
-            provider = next((p for p in providers if p.name == selected_ex), None)
-            if provider:
-                with st.spinner(f"正在从 {provider.name} 获取 {selected_sym} 的订单簿..."):
-                    order_book = safe_run_async(provider.get_order_book(selected_sym))
-                    if order_book and 'error' not in order_book:
-                        st.plotly_chart(_create_depth_chart(order_book), width='stretch', key="order_book_depth_chart")
-                    else:
-                        display_error(f"无法获取订单簿: {order_book.get('error', '未知错误')}")
+    st.markdown("---")
+    with st.expander("🗄️ 本地行情历史", expanded=False):
+        show_ticker_history_view()
 
     st.markdown("---")
     with st.expander("🏢 交易所定性对比", expanded=False):
@@ -371,22 +489,36 @@ def render_unified_price_comparison(providers: List[BaseProvider]):
         show_enhanced_ccxt_features()
 
 
+QUALITATIVE_LABELS = {
+    'security_measures': '安全措施', 'customer_service': '客户服务', 'platform_stability': '平台稳定性',
+    'fund_insurance': '资金保险', 'regional_restrictions': '地区限制', 'withdrawal_limits': '提现限额',
+    'withdrawal_speed': '提现速度', 'supported_cross_chain_bridges': '支持的跨链桥',
+    'api_support_details': 'API支持详情', 'fee_discounts': '手续费折扣', 'margin_leverage_details': '杠杆交易详情',
+    'maintenance_schedule': '维护计划', 'user_rating_summary': '用户评分摘要', 'tax_compliance_info': '税务合规信息',
+    'deposit_networks': '充值网络', 'deposit_fees': '充值费用', 'withdrawal_networks': '提现网络',
+    'margin_trading_api': '保证金交易API'
+}
+
+@st.cache_data(show_spinner=False)
+def _build_qualitative_table(_qualitative_data: dict, selected: tuple) -> pd.DataFrame:
+    """
+    Builds the qualitative comparison table for the selected exchanges.
+
+    The qualitative data comes from the cached config and does not change between
+    reruns, so only the selection is part of the cache key.
+    """
+    comparison_data = {exch: _qualitative_data[exch] for exch in selected if exch in _qualitative_data}
+    df = pd.DataFrame(comparison_data).rename(index=QUALITATIVE_LABELS)
+    all_keys_df = pd.DataFrame(index=list(QUALITATIVE_LABELS.values()))
+    return all_keys_df.join(df).fillna("N/A")
+
+@st.fragment
 def show_comparison_view(qualitative_data: dict, providers: List[BaseProvider]):
     """Displays a side-by-side comparison of qualitative data for selected exchanges."""
     if not qualitative_data:
         st.warning("未找到定性数据。")
         return
 
-    key_to_chinese = {
-        'security_measures': '安全措施', 'customer_service': '客户服务', 'platform_stability': '平台稳定性',
-        'fund_insurance': '资金保险', 'regional_restrictions': '地区限制', 'withdrawal_limits': '提现限额',
-        'withdrawal_speed': '提现速度', 'supported_cross_chain_bridges': '支持的跨链桥',
-        'api_support_details': 'API支持详情', 'fee_discounts': '手续费折扣', 'margin_leverage_details': '杠杆交易详情',
-        'maintenance_schedule': '维护计划', 'user_rating_summary': '用户评分摘要', 'tax_compliance_info': '税务合规信息',
-        'deposit_networks': '充值网络', 'deposit_fees': '充值费用', 'withdrawal_networks': '提现网络',
-        'margin_trading_api': '保证金交易API'
-    }
-
     exchange_list = list(qualitative_data.keys())
     selected = st.multiselect(
         "选择要比较的交易所",
@@ -397,17 +529,22 @@ def show_comparison_view(qualitative_data: dict, providers: List[BaseProvider]):
     )
 
     if selected:
-        comparison_data = {exch: qualitative_data[exch] for exch in selected if exch in qualitative_data}
-        df = pd.DataFrame(comparison_data).rename(index=key_to_chinese)
-        all_keys_df = pd.DataFrame(index=list(key_to_chinese.values()))
-        df_display = all_keys_df.join(df).fillna("N/A")
-        st.dataframe(df_display, width='stretch')
+        st.dataframe(_build_qualitative_table(qualitative_data, tuple(selected)), width='stretch')
 
     with st.expander("🪙 资产转账分析"):
         cex_providers = [p for p in providers if isinstance(p, CEXProvider)]
         show_asset_transfer_view(cex_providers, providers)
 
 
+def _format_withdraw_fee(details) -> str:
+    """Formats a network's withdrawal fee for display."""
+    if details is None:
+        return "不支持"
+    fee = details.get('fee')
+    return f"{fee:.6f}".rstrip('0').rstrip('.') if fee is not None else "N/A"
+
+
+@st.fragment
 def show_asset_transfer_view(cex_providers: List[CEXProvider], providers: List[BaseProvider]):
     """Displays a side-by-side comparison of transfer fees for a given asset."""
     asset = st.text_input("输入要比较的资产代码", "USDT", key="transfer_asset_input").upper()
@@ -418,29 +555,29 @@ def show_asset_transfer_view(cex_providers: List[CEXProvider], providers: List[B
             return
 
         with st.spinner(f"正在从所有选定的交易所获取 {asset} 的转账费用..."):
-            results = safe_run_async(asyncio.gather(*[p.get_transfer_fees(asset) for p in cex_providers]))
+            results = safe_run_async(gather(*[p.get_transfer_fees(asset) for p in cex_providers]))
 
-        all_networks = set()
-        processed_data = {}
+        withdraw_by_provider = {}
         failed_providers = []
 
-        for i, res in enumerate(results):
-            provider_name = cex_providers[i].name.capitalize()
+        for provider, res in zip(cex_providers, results or []):
+            provider_name = provider.name.capitalize()
             if isinstance(res, dict) and 'error' not in res:
-                withdraw_info = res.get('withdraw', {})
-                processed_data[provider_name] = {}
-                for network, details in withdraw_info.items():
-                    all_networks.add(network)
-                    fee = details.get('fee')
-                    processed_data[provider_name][network] = f"{fee:.6f}".rstrip('0').rstrip('.') if fee is not None else "N/A"
+                withdraw_by_provider[provider_name] = res.get('withdraw', {})
             else:
                 failed_providers.append(provider_name)
 
         if failed_providers:
             st.warning(f"无法获取以下交易所的费用数据: {', '.join(failed_providers)}。")
 
-        if processed_data:
-            df = pd.DataFrame(processed_data).reindex(sorted(list(all_networks))).fillna("不支持")
+        if withdraw_by_provider:
+            # Build one column list per provider and create the frame in a single step.
+            networks = sorted({network for info in withdraw_by_provider.values() for network in info})
+            columns = {
+                provider_name: [_format_withdraw_fee(info.get(network)) for network in networks]
+                for provider_name, info in withdraw_by_provider.items()
+            }
+            df = pd.DataFrame(columns, index=networks)
             st.subheader(f"{asset} 提现费用对比")
             st.dataframe(df, width='stretch')
         else:
@@ -450,6 +587,7 @@ def show_asset_transfer_view(cex_providers: List[CEXProvider], providers: List[B
         show_kline_view(providers)
 
 
+@st.fragment
 def show_kline_view(providers: List[BaseProvider]):
     """Displays a candlestick chart for a selected symbol and exchange."""
     cex_providers = [p for p in providers if isinstance(p, CEXProvider)]
@@ -490,6 +628,60 @@ def show_kline_view(providers: List[BaseProvider]):
                     else:
                         display_error(f"无法获取 {symbol} 的K线数据。")
 
+HISTORY_SHOWN_SAMPLES = 2000
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _query_hist(_db_manager: DatabaseManager, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Queries stored tickers, caching results per (symbol, start, end) for five minutes."""
+    return run_async(_db_manager.query_historical_data(symbol, start, end))
+
+@st.fragment
+def show_ticker_history_view():
+    """Plots the tickers saved to the local database for a symbol and date range."""
+    db_manager = get_db_manager(get_config().get('sqlite_db_path'))
+    if db_manager is None:
+        st.warning("本地数据库不可用。")
+        return
+
+    col1, col2 = st.columns(2)
+    symbol = col1.text_input("输入交易对", (st.session_state.get('selected_symbols') or ['BTC/USDT'])[0], key="history_symbol")
+    today = datetime.utcnow().date()
+    date_range = col2.date_input("日期范围 (UTC)", value=(today - timedelta(days=1), today), key="history_range")
+
+    if st.button("查询历史行情", key="history_button") and _validate_symbol(symbol):
+        if len(date_range) != 2:
+            st.error("请选择开始和结束日期。")
+            return
+        start = datetime.combine(date_range[0], datetime.min.time())
+        end = datetime.combine(date_range[1], datetime.max.time())
+        try:
+            df = _query_hist(db_manager, symbol, start, end)
+        except Exception as e:
+            display_error(f"查询历史数据失败: {e}")
+            return
+
+        if df.empty:
+            st.info(f"数据库中没有 {symbol} 在该时间段内的行情记录。")
+            return
+
+        fig = go.Figure()
+        if FigureResampler is not None:
+            # The stored history grows without bound; only send a downsampled view of each series.
+            fig = FigureResampler(fig, default_n_shown_samples=HISTORY_SHOWN_SAMPLES)
+        # groupby(sort=False) keeps the query order and splits the frame in one pass;
+        # native datetime64/float64 arrays keep Plotly off the per-point conversion path.
+        for provider_name, provider_df in df.groupby('provider_name', sort=False):
+            x = provider_df['timestamp'].to_numpy(dtype='datetime64[ms]')
+            y = provider_df['price'].to_numpy(dtype=np.float64)
+            trace = go.Scattergl(mode='lines', name=provider_name)
+            if FigureResampler is not None:
+                fig.add_trace(trace, hf_x=x, hf_y=y)
+            else:
+                fig.add_trace(trace.update(x=x, y=y))
+        fig.update_layout(title_text=f"{symbol} 历史价格", xaxis_title="时间 (UTC)", yaxis_title="价格", height=400, margin=dict(l=20, r=20, t=40, b=20))
+        st.plotly_chart(fig, width='stretch', key="ticker_history_chart")
+
+@st.fragment
 def show_funding_rate_view():
     """显示资金费率套利机会"""
     st.subheader("💰 永续合约资金费率分析")
@@ -557,20 +749,16 @@ def show_funding_rate_view():
             # 创建机会表格
             opp_df = pd.DataFrame(filtered_opportunities)
             
-            # 格式化显示
-            display_df = opp_df[[
-                'symbol', 'long_exchange', 'short_exchange', 
-                'rate_difference', 'annual_return_pct', 'risk_level'
-            ]].copy()
-            
-            display_df.columns = [
-                '交易对', '做多交易所', '做空交易所', 
-                '费率差异(%)', '年化收益率(%)', '风险等级'
-            ]
+            # 格式化显示：一次性选列并重命名，避免先复制再整体替换列名
+            display_columns = {
+                'symbol': '交易对', 'long_exchange': '做多交易所', 'short_exchange': '做空交易所',
+                'rate_difference': '费率差异(%)', 'annual_return_pct': '年化收益率(%)', 'risk_level': '风险等级'
+            }
+            display_df = opp_df.loc[:, list(display_columns)].rename(columns=display_columns)
             
             # 格式化数值
-            display_df['费率差异(%)'] = (display_df['费率差异(%)'] * 100).round(4)
-            display_df['年化收益率(%)'] = display_df['年化收益率(%)'].round(2)
+            display_df['费率差异(%)'] = (display_df['费率差异(%)'].astype(np.float64) * 100).round(4)
+            display_df['年化收益率(%)'] = display_df['年化收益率(%)'].astype(np.float64).round(2)
             
             st.dataframe(
                 display_df,
@@ -666,18 +854,15 @@ def show_arbitrage_opportunities():
 
 def show_exchange_health_monitor():
     """显示交易所健康状态监控功能"""
-    from src.ui.monitoring_components import render_exchange_health_monitor
     render_exchange_health_monitor()
 
 def show_cross_chain_analysis():
     """显示跨链转账效率与成本分析"""
-    from src.ui.monitoring_components import render_cross_chain_analysis
     render_cross_chain_analysis()
 
 
 def show_enhanced_ccxt_features():
     """显示增强的CCXT功能"""
-    from src.ui.monitoring_components import render_enhanced_ccxt_features
     render_enhanced_ccxt_features()
 
 
@@ -935,7 +1120,14 @@ def main():
         
         sidebar_controls()
 
-        providers = get_providers(config, st.session_state)
+        api_keys = st.session_state.get('api_keys', {})
+        providers = get_providers(
+            config,
+            api_keys,
+            demo_mode=not bool(api_keys),
+            selected_exchanges=tuple(st.session_state.selected_exchanges),
+            api_keys_hash=_hash_api_keys(api_keys)
+        )
         if not providers:
             st.error("没有可用的数据提供商。请在侧边栏中选择交易所或检查配置。")
             st.info("💡 提示：请在侧边栏中选择至少一个交易所来开始使用。")
@@ -968,9 +1160,7 @@ def main():
         # Auto refresh footer
         if st.session_state.get('auto_refresh_enabled', False):
             interval = st.session_state.get('auto_refresh_interval', 10)
-            st.info(f"🔄 自动刷新已启用，每 {interval} 秒刷新一次")
-            time.sleep(interval)
-            st.rerun()
+            st.info(f"🔄 自动刷新已启用，行情与套利机会每 {interval} 秒刷新一次")
     
     # 渲染页面底部
     render_footer()
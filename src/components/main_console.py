@@ -13,10 +13,10 @@ from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from functools import lru_cache
 import time
-import asyncio
 
 # 导入真实数据服务
 from providers.real_data_service import real_data_service
+from src.utils.async_utils import run_async
 
 # 配置常量
 class ConsoleConfig:
@@ -106,12 +106,7 @@ class DataGenerator:
         """生成市场热力图数据 - 使用真实API数据"""
         try:
             # 获取真实价格矩阵数据
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            price_matrix = loop.run_until_complete(
-                real_data_service.get_price_matrix()
-            )
-            loop.close()
+            price_matrix = run_async(real_data_service.get_price_matrix())
             
             if price_matrix:
                 # 转换为numpy数组
@@ -145,12 +140,7 @@ class DataGenerator:
         """生成交易量数据 - 使用真实API数据"""
         try:
             # 获取真实交易量数据
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            volume_data = loop.run_until_complete(
-                real_data_service.get_volume_data()
-            )
-            loop.close()
+            volume_data = run_async(real_data_service.get_volume_data())
             
             if volume_data:
                 # 按照配置的交易所顺序返回数据
@@ -177,12 +167,7 @@ class DataGenerator:
         """生成盈利趋势数据 - 使用真实API数据"""
         try:
             # 获取真实盈利趋势数据
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            timestamps, profits = loop.run_until_complete(
-                real_data_service.get_profit_trend_data(hours)
-            )
-            loop.close()
+            timestamps, profits = run_async(real_data_service.get_profit_trend_data(hours))
             
             return timestamps, profits
             
@@ -199,12 +184,7 @@ class DataGenerator:
         """生成套利机会数据 - 使用真实API数据"""
         try:
             # 使用异步函数获取真实套利机会
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            opportunities = loop.run_until_complete(
-                real_data_service.get_real_arbitrage_opportunities()
-            )
-            loop.close()
+            opportunities = run_async(real_data_service.get_real_arbitrage_opportunities())
             
             # 转换为字典格式以便显示
             return [
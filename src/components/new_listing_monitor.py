@@ -5,13 +5,13 @@
 
 import streamlit as st
 import pandas as pd
-import asyncio
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import plotly.express as px
 import plotly.graph_objects as go
 
 from providers.real_data_service import real_data_service
+from src.utils.async_utils import run_async
 
 class NewListingMonitor:
     """新货币上市监控器"""
@@ -27,12 +27,7 @@ class NewListingMonitor:
         """获取新上市货币"""
         try:
             # 使用异步函数获取新上市检测
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            new_listings = loop.run_until_complete(
-                real_data_service.detect_new_listings()
-            )
-            loop.close()
+            new_listings = run_async(real_data_service.detect_new_listings())
             
             return new_listings
             
@@ -1,10 +1,20 @@
 import aiosqlite
 import asyncio
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from datetime import datetime
 import pandas as pd
 
+from src.providers.base import Ticker
+
+INSERT_TICKER_SQL = (
+    "INSERT INTO ticker_data (timestamp, provider_name, symbol, price, bid, ask, volume) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+TICKER_COLUMNS = ('timestamp', 'provider_name', 'symbol', 'price', 'bid', 'ask', 'volume')
+# Rows fetched per round trip when streaming query results
+QUERY_CHUNK_SIZE = 10_000
+
 class DatabaseManager:
     """
     Manages the connection to a SQLite database and handles all data
@@ -24,6 +34,10 @@ class DatabaseManager:
         try:
             self._conn = await aiosqlite.connect(self.db_path)
             self._conn.row_factory = aiosqlite.Row
+            # Live ticks are flushed in many small batches; WAL with NORMAL sync
+            # avoids a full fsync of the rollback journal on every commit.
+            await self._conn.execute("PRAGMA journal_mode=WAL;")
+            await self._conn.execute("PRAGMA synchronous=NORMAL;")
             print(f"Successfully connected to SQLite database at {self.db_path}")
             return self
         except Exception as e:
@@ -62,37 +76,48 @@ class DatabaseManager:
         await self._conn.commit()
         print("Database initialization complete.")
 
-    async def save_ticker_data(self, data: List[Dict[str, Any]]):
+    async def save_ticker_data(self, data: List[Union[Ticker, Dict[str, Any]]]):
         """
         Saves a batch of ticker data records to the database using executemany.
+        Records may be `Ticker` tuples or legacy ticker dictionaries.
         """
         if not self._conn:
             raise ConnectionError("Database is not connected.")
         if not data:
             return
 
-        records_to_insert = [
+        # sqlite3 consumes any iterable, so rows are generated lazily instead of
+        # materializing a second list alongside the input records.
+        records_to_insert = (
             (
-                d.get('timestamp').isoformat() if isinstance(d.get('timestamp'), datetime) else d.get('timestamp', datetime.utcnow().isoformat()),
-                d.get('provider_name'),
-                d.get('symbol'),
-                d.get('price'),
-                d.get('bid'),
-                d.get('ask'),
-                d.get('volume')
-            ) for d in data
-        ]
-
-        await self._conn.executemany(
-            "INSERT INTO ticker_data (timestamp, provider_name, symbol, price, bid, ask, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            records_to_insert
+                datetime.utcfromtimestamp(t.ts / 1000).isoformat() if t.ts else datetime.utcnow().isoformat(),
+                t.provider,
+                t.symbol,
+                t.last,
+                t.bid,
+                t.ask,
+                t.volume
+            ) if isinstance(t, Ticker) else (
+                t.get('timestamp').isoformat() if isinstance(t.get('timestamp'), datetime) else t.get('timestamp', datetime.utcnow().isoformat()),
+                t.get('provider_name'),
+                t.get('symbol'),
+                t.get('price'),
+                t.get('bid'),
+                t.get('ask'),
+                t.get('volume')
+            ) for t in data
         )
+
+        await self._conn.executemany(INSERT_TICKER_SQL, records_to_insert)
         await self._conn.commit()
-        print(f"Successfully saved {len(records_to_insert)} records to the database.")
+        print(f"Successfully saved {len(data)} records to the database.")
 
     async def query_historical_data(self, symbol: str, start_time: datetime, end_time: datetime) -> pd.DataFrame:
         """
         Queries historical data for a given symbol and time range.
+
+        Returns a DataFrame with the `TICKER_COLUMNS` columns in that order and
+        `timestamp` parsed to datetime64, or an empty DataFrame if nothing matches.
         """
         if not self._conn:
             raise ConnectionError("Database is not connected.")
@@ -100,8 +125,24 @@ class DatabaseManager:
         start_str = start_time.isoformat()
         end_str = end_time.isoformat()
 
-        query = "SELECT * FROM ticker_data WHERE symbol = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp ASC;"
+        query = (
+            f"SELECT {', '.join(TICKER_COLUMNS)} FROM ticker_data "
+            "WHERE symbol = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp ASC;"
+        )
+        # Stream rows in chunks straight into per-column lists rather than
+        # materializing every row as a dict.
+        columns: Dict[str, list] = {name: [] for name in TICKER_COLUMNS}
         async with self._conn.execute(query, (symbol, start_str, end_str)) as cursor:
-            records = await cursor.fetchall()
+            while True:
+                rows = await cursor.fetchmany(QUERY_CHUNK_SIZE)
+                if not rows:
+                    break
+                for name, values in zip(TICKER_COLUMNS, zip(*rows)):
+                    columns[name].extend(values)
+
+        if not columns['timestamp']:
+            return pd.DataFrame()
 
-        return pd.DataFrame([dict(row) for row in records]) if records else pd.DataFrame()
+        df = pd.DataFrame(columns)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+        return df
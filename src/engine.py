@@ -1,13 +1,18 @@
 import asyncio
-import itertools
-from typing import List, Dict, Any, TypedDict
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple, TypedDict
 
-from src.providers.base import BaseProvider
+import numpy as np
+
+from src.engine_kernels import scan
+from src.providers.base import BaseProvider, Ticker
 
 # --- Constants for default values ---
 DEFAULT_PROFIT_THRESHOLD_PERCENT = 0.1
 DEFAULT_TAKER_FEE = 0.002
 DEFAULT_WITHDRAWAL_FEE = 0.0
+DEFAULT_TOP_K = 5
+DEFAULT_TICKER_TIMEOUT_SECONDS = 1.0
 
 class Opportunity(TypedDict):
     """A dictionary representing a single arbitrage opportunity."""
@@ -32,14 +37,50 @@ class ArbitrageEngine:
 
         Args:
             providers: A list of instantiated provider objects.
-            config: A dictionary containing 'fees' and 'threshold' settings.
+            config: A dictionary containing 'fees', 'threshold' and optional
+                'top_k' and 'ticker_timeout' (seconds) settings.
         """
         self.providers = providers
         self.fees_config = config.get('fees', {})
         # Convert profit threshold from percentage to a decimal
         self.profit_threshold = config.get('threshold', DEFAULT_PROFIT_THRESHOLD_PERCENT)
-
-    async def find_opportunities(self, symbols: List[str]) -> List[Opportunity]:
+        # Number of cheapest buy legs and richest sell legs considered per symbol.
+        # At least two, so a provider that is both the cheapest buyer and the
+        # richest seller still leaves a counterpart for each of its legs.
+        self.top_k = max(2, int(config.get('top_k', DEFAULT_TOP_K)))
+        # Latency budget for a scan; tickers still pending afterwards are dropped
+        self.ticker_timeout = config.get('ticker_timeout', DEFAULT_TICKER_TIMEOUT_SECONDS)
+
+        # Fees are static for the lifetime of the engine, so resolve each
+        # provider's schedule once, keyed by lowercased name with the
+        # 'default' schedule materialized for providers not listed.
+        default_fees = self.fees_config.get('default', {})
+        self._taker: Dict[str, float] = {}
+        self._wd_fees: Dict[str, Dict[str, float]] = {}
+        for provider in providers:
+            name = provider.name.lower()
+            fees = self.fees_config.get(name, default_fees)
+            self._taker[name] = fees.get('taker', DEFAULT_TAKER_FEE)
+            self._wd_fees[name] = fees.get('withdrawal_fees', {})
+
+        # Per-provider-index arrays consumed by the scan kernel
+        self._provider_keys = [provider.name.lower() for provider in providers]
+        self._provider_index = {provider.name: i for i, provider in enumerate(providers)}
+        self._taker_fees = np.array([self._taker[key] for key in self._provider_keys], dtype=np.float64)
+        self._withdrawal_by_asset: Dict[str, np.ndarray] = {}
+
+    def _withdrawal_fees_for(self, base_asset: str) -> np.ndarray:
+        """Returns the per-provider withdrawal fee array for an asset, building it on first use."""
+        fees = self._withdrawal_by_asset.get(base_asset)
+        if fees is None:
+            fees = np.array(
+                [self._wd_fees[key].get(base_asset, DEFAULT_WITHDRAWAL_FEE) for key in self._provider_keys],
+                dtype=np.float64,
+            )
+            self._withdrawal_by_asset[base_asset] = fees
+        return fees
+
+    async def find_opportunities(self, symbols: List[str], exhaustive: bool = False) -> List[Opportunity]:
         """
         Compares prices across all providers for given symbols and identifies
         potential arbitrage opportunities after accounting for fees.
@@ -52,79 +93,155 @@ class ArbitrageEngine:
         5. Sell the asset on the sell_exchange.
         6. Pay the taker fee for this sale.
 
+        With more than `top_k` providers quoting a symbol, only the `top_k`
+        cheapest buy legs and `top_k` richest sell legs (after fees) are paired,
+        which always includes the single best opportunity.
+
         Args:
             symbols: A list of symbols to check for arbitrage (e.g., ['BTC/USDT']).
+            exhaustive: If True, evaluate every provider pair regardless of `top_k`.
 
         Returns:
             A list of Opportunity dictionaries, each representing a profitable trade.
         """
-        all_opportunities: List[Opportunity] = []
-        for symbol in symbols:
-            tasks = [provider.get_ticker(symbol) for provider in self.providers]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Fetch every (symbol, provider) ticker concurrently and analyze whatever
+        # arrived within the latency budget, so one slow provider cannot stall
+        # the scan or leave the faster providers' quotes stale.
+        symbols = list(dict.fromkeys(symbols))
+        requests = [(symbol, i) for symbol in symbols for i in range(len(self.providers))]
+        tasks = [asyncio.ensure_future(self.providers[i].get_ticker(symbol)) for symbol, i in requests]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.ticker_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        quotes = [
+            (symbol, i, task.result())
+            for (symbol, i), task in zip(requests, tasks)
+            if not task.cancelled() and task.exception() is None
+        ]
+        return self._scan_quotes(symbols, quotes, exhaustive)
+
+    def scan_tickers(
+        self, symbols: List[str], tickers: Iterable[Dict[str, Any]], exhaustive: bool = False
+    ) -> List[Opportunity]:
+        """
+        Finds opportunities in tickers that were already fetched, without any I/O.
+
+        This lets callers that keep their own ticker snapshot (e.g. a cached
+        price table) reuse it instead of querying every exchange again.
 
-            valid_tickers = []
-            for i, res in enumerate(results):
-                if isinstance(res, dict) and 'error' not in res and res.get('ask') and res.get('bid'):
-                    res['provider_name'] = self.providers[i].name
-                    valid_tickers.append(res)
+        Args:
+            symbols: The symbols to check; tickers for other symbols are ignored.
+            tickers: ccxt-style ticker dicts, each carrying a 'provider' key with
+                the name of one of the engine's providers.
+            exhaustive: If True, evaluate every provider pair regardless of `top_k`.
 
+        Returns:
+            A list of Opportunity dictionaries, as `find_opportunities` returns.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        quotes = []
+        for ticker in tickers:
+            i = self._provider_index.get(ticker.get('provider'))
+            if i is not None:
+                quotes.append((ticker.get('symbol'), i, ticker))
+        # Match the provider order used when the engine fetches tickers itself
+        quotes.sort(key=lambda quote: quote[1])
+        return self._scan_quotes(symbols, quotes, exhaustive)
+
+    def _scan_quotes(
+        self, symbols: List[str], quotes: List[Tuple[str, int, Any]], exhaustive: bool
+    ) -> List[Opportunity]:
+        """Groups valid (symbol, provider index, ticker dict) quotes by symbol and scans each symbol."""
+        tickers_by_symbol: Dict[str, List[Ticker]] = defaultdict(list)
+        indices_by_symbol: Dict[str, List[int]] = defaultdict(list)
+        for symbol, i, res in quotes:
+            if isinstance(res, dict) and 'error' not in res and res.get('ask') and res.get('bid'):
+                tickers_by_symbol[symbol].append(Ticker.from_ccxt(res, provider=self.providers[i].name))
+                indices_by_symbol[symbol].append(i)
+
+        all_opportunities: List[Opportunity] = []
+        for symbol in symbols:
+            valid_tickers = tickers_by_symbol.get(symbol, [])
             if len(valid_tickers) < 2:
                 continue
 
-            for buy_ticker, sell_ticker in itertools.permutations(valid_tickers, 2):
-                buy_provider_name = buy_ticker['provider_name']
-                sell_provider_name = sell_ticker['provider_name']
-                buy_price = float(buy_ticker['ask'])
-                sell_price = float(sell_ticker['bid'])
-
-                if buy_price >= sell_price:
-                    continue
-
-                default_fees = self.fees_config.get('default', {})
-                buy_fees = self.fees_config.get(buy_provider_name.lower(), default_fees)
-                sell_fees = self.fees_config.get(sell_provider_name.lower(), default_fees)
-
-                buy_taker_fee = buy_fees.get('taker', DEFAULT_TAKER_FEE)
-                sell_taker_fee = sell_fees.get('taker', DEFAULT_TAKER_FEE)
-
-                base_asset = symbol.split('/')[0]
-                withdrawal_fees_map = buy_fees.get('withdrawal_fees', {})
-                withdrawal_fee_asset = withdrawal_fees_map.get(base_asset, DEFAULT_WITHDRAWAL_FEE)
-
-                # --- Fee Calculation ---
-                initial_cost_usd = buy_price
-                buy_fee_usd = initial_cost_usd * buy_taker_fee
-                total_cost_usd = initial_cost_usd + buy_fee_usd
-
-                revenue_usd = sell_price
-                sell_fee_usd = revenue_usd * sell_taker_fee
-                withdrawal_fee_usd = withdrawal_fee_asset * buy_price # Estimate value at time of purchase
-                net_revenue_usd = revenue_usd - sell_fee_usd
-
-                net_profit_usd = net_revenue_usd - total_cost_usd - withdrawal_fee_usd
-
-                if net_profit_usd <= 0:
-                    continue
-
-                profit_percentage = (net_profit_usd / total_cost_usd) * 100
-
-                if profit_percentage > self.profit_threshold:
-                    gross_profit_usd = sell_price - buy_price
-                    total_fees_usd = buy_fee_usd + sell_fee_usd + withdrawal_fee_usd
-
-                    opportunity: Opportunity = {
-                        'id': f"{symbol}-{buy_provider_name}-{sell_provider_name}",
-                        'symbol': symbol,
-                        'buy_at': buy_provider_name,
-                        'sell_at': sell_provider_name,
-                        'buy_price': round(buy_price, 4),
-                        'sell_price': round(sell_price, 4),
-                        'gross_profit_usd': round(gross_profit_usd, 4),
-                        'total_fees_usd': round(total_fees_usd, 4),
-                        'net_profit_usd': round(net_profit_usd, 4),
-                        'profit_percentage': round(profit_percentage, 4),
-                    }
-                    all_opportunities.append(opportunity)
+            all_opportunities.extend(
+                self._scan_symbol(
+                    symbol, valid_tickers, np.array(indices_by_symbol[symbol], dtype=np.intp), exhaustive
+                )
+            )
 
         return all_opportunities
+
+    def _scan_symbol(
+        self, symbol: str, tickers: List[Ticker], provider_indices: np.ndarray, exhaustive: bool = False
+    ) -> List[Opportunity]:
+        """
+        Evaluates every ordered (buy, sell) pair of tickers for one symbol at once.
+
+        Tickers are laid out as parallel arrays (one slot per provider) and the
+        full N x N profit matrix is computed by the `scan` kernel; rows are buy
+        legs and columns are sell legs. Opportunity dicts are only built for
+        the pairs that clear the profit threshold.
+        """
+        base_asset = symbol.split('/')[0]
+        asks = np.array([t.ask for t in tickers], dtype=np.float64)
+        bids = np.array([t.bid for t in tickers], dtype=np.float64)
+        taker = self._taker_fees[provider_indices]
+        withdrawal = self._withdrawal_fees_for(base_asset)[provider_indices]
+
+        if not exhaustive and len(tickers) > self.top_k:
+            candidates = self._top_candidates(asks, bids, taker, withdrawal)
+            tickers = [tickers[c] for c in candidates]
+            asks, bids = asks[candidates], bids[candidates]
+            taker, withdrawal = taker[candidates], withdrawal[candidates]
+
+        mask, profit_pct = scan(asks, bids, taker, withdrawal, float(self.profit_threshold))
+
+        opportunities: List[Opportunity] = []
+        for i, j in np.argwhere(mask):
+            buy_provider_name = tickers[i].provider
+            sell_provider_name = tickers[j].provider
+            buy_price = float(asks[i])
+            sell_price = float(bids[j])
+            buy_fee_usd = buy_price * float(taker[i])
+            sell_fee_usd = sell_price * float(taker[j])
+            withdrawal_fee_usd = float(withdrawal[i]) * buy_price
+            net_profit_usd = (sell_price - sell_fee_usd) - (buy_price + buy_fee_usd) - withdrawal_fee_usd
+
+            opportunity: Opportunity = {
+                'id': f"{symbol}-{buy_provider_name}-{sell_provider_name}",
+                'symbol': symbol,
+                'buy_at': buy_provider_name,
+                'sell_at': sell_provider_name,
+                'buy_price': round(buy_price, 4),
+                'sell_price': round(sell_price, 4),
+                'gross_profit_usd': round(sell_price - buy_price, 4),
+                'total_fees_usd': round(buy_fee_usd + sell_fee_usd + withdrawal_fee_usd, 4),
+                'net_profit_usd': round(net_profit_usd, 4),
+                'profit_percentage': round(float(profit_pct[i, j]), 4),
+            }
+            opportunities.append(opportunity)
+
+        return opportunities
+
+    def _top_candidates(self, asks: np.ndarray, bids: np.ndarray, taker: np.ndarray, withdrawal: np.ndarray) -> np.ndarray:
+        """
+        Returns the sorted indices of the `top_k` lowest-cost buy legs and the
+        `top_k` highest-revenue sell legs.
+
+        Per-unit cost and revenue are separable by provider once fees are
+        applied, so the most profitable pairs are drawn from these two sets.
+        The best buy leg for any seller is the cheapest other provider, which is
+        always among the two cheapest, and likewise for sell legs; `top_k >= 2`
+        therefore keeps the best pair even when one provider leads both sides.
+        """
+        k = self.top_k
+        effective_cost = asks * (1 + taker) + withdrawal * asks
+        effective_revenue = bids * (1 - taker)
+        buyers = np.argpartition(effective_cost, k - 1)[:k]
+        sellers = np.argpartition(-effective_revenue, k - 1)[:k]
+        return np.union1d(buyers, sellers)
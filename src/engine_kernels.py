@@ -0,0 +1,77 @@
+"""
+Numeric kernels for the ArbitrageEngine.
+
+The fee-adjusted N x N arbitrage scan is compiled with Numba when it is
+installed. Otherwise an equivalent NumPy broadcasting implementation is used,
+so the engine behaves identically either way.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _scan_loops(asks, bids, taker, withdrawal, threshold):
+    """
+    Scans every ordered (buy, sell) pair with explicit loops.
+
+    Rows of the returned arrays are buy legs and columns are sell legs. The
+    profit matrix is filled for every pair; only `mask` excludes the diagonal.
+
+    Args:
+        asks: Ask price per provider.
+        bids: Bid price per provider.
+        taker: Taker fee rate per provider.
+        withdrawal: Withdrawal fee per provider, in units of the base asset.
+        threshold: Minimum profit percentage for a pair to be reported.
+
+    Returns:
+        A tuple of (mask, profit_pct) N x N arrays.
+    """
+    n = asks.shape[0]
+    mask = np.zeros((n, n), dtype=np.bool_)
+    profit_pct = np.zeros((n, n), dtype=np.float64)
+    for i in range(n):
+        total_cost = asks[i] * (1.0 + taker[i])
+        withdrawal_usd = withdrawal[i] * asks[i]
+        # The inner loop is kept free of data-dependent branches so LLVM can
+        # vectorize it: every pair is computed and then masked, including i == j.
+        for j in range(n):
+            net_profit = bids[j] * (1.0 - taker[j]) - total_cost - withdrawal_usd
+            pct = net_profit / total_cost * 100.0
+            profit_pct[i, j] = pct
+            mask[i, j] = (asks[i] < bids[j]) & (net_profit > 0.0) & (pct > threshold) & (i != j)
+    return mask, profit_pct
+
+
+def _scan_numpy(asks, bids, taker, withdrawal, threshold):
+    """NumPy broadcasting equivalent of `_scan_loops`, used when Numba is unavailable."""
+    total_cost = asks[:, None] * (1 + taker[:, None])
+    withdrawal_usd = withdrawal[:, None] * asks[:, None]  # Estimate value at time of purchase
+    net_revenue = bids[None, :] * (1 - taker[None, :])
+    net_profit = net_revenue - total_cost - withdrawal_usd
+    profit_pct = net_profit / total_cost * 100
+
+    mask = (asks[:, None] < bids[None, :]) & (net_profit > 0) & (profit_pct > threshold)
+    np.fill_diagonal(mask, False)
+    return mask, profit_pct
+
+
+if HAS_NUMBA:
+    # An explicit signature compiles eagerly at import time, and cache=True
+    # persists the machine code so later processes skip compilation entirely.
+    scan = njit(
+        'Tuple((b1[:, :], f8[:, :]))(f8[:], f8[:], f8[:], f8[:], f8)',
+        cache=True,
+        fastmath=True,
+    )(_scan_loops)
+else:
+    logger.info("numba not found. Using the NumPy implementation of the arbitrage scan.")
+    scan = _scan_numpy
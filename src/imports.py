@@ -4,6 +4,9 @@
 
 # --- Standard Library Imports ---
 import asyncio
+import functools
+import hashlib
+import json
 import time
 import logging
 from typing import List, Dict, Any
@@ -18,14 +21,22 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import nest_asyncio
 
+try:
+    # 可选依赖：对长时间序列做 LTTB 降采样，只向浏览器发送可见范围内的聚合点
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
+
 # --- Core Application Imports ---
 from src.config import load_config
 from src.db import DatabaseManager
 from src.engine import ArbitrageEngine, Opportunity
+from src.utils.async_utils import gather, get_event_loop, run_async, safe_run_async
 
 # --- Provider Imports ---
 from src.providers.base import BaseProvider
 from src.providers.cex import CEXProvider
+from src.providers.shared import get_session
 from src.providers.dex import DEXProvider
 from src.providers.bridge import BridgeProvider
 from src.providers.free_api import FreeAPIProvider, free_api_provider
@@ -83,7 +94,7 @@ from src.providers.account_manager import (
 
 # --- UI Imports ---
 from src.ui.trading_interface import TradingInterface, trading_interface
-from src.ui.components import sidebar_controls, display_error
+from src.ui.components import sidebar_controls, display_error, order_book_levels
 from src.ui.navigation import render_navigation, render_page_header, render_quick_stats, render_footer
 
 def setup_logging():
@@ -296,6 +296,8 @@ def main():
         # 按24h变化排序
         sorted_data = sorted(currencies_data, key=lambda x: x['涨跌24h'], reverse=True)
         
+        # 整列卡片拼成一段 HTML，只发送一条 markdown 消息
+        ranking_cards = []
         for i, data in enumerate(sorted_data, 1):
             change = data['涨跌24h']
             if change > 0:
@@ -307,13 +309,10 @@ def main():
             else:
                 style_class = "neutral"
                 icon = "➡️"
-            
-            st.markdown(f"""
-            <div class="{style_class}">
-                {icon} #{i} {data['symbol']}: {change:+.2f}%
-            </div>
-            """, unsafe_allow_html=True)
-            st.write("")
+            ranking_cards.append(
+                f'<div class="{style_class}" style="margin-bottom: 1rem;">{icon} #{i} {data["symbol"]}: {change:+.2f}%</div>'
+            )
+        st.markdown("".join(ranking_cards), unsafe_allow_html=True)
     
     with perf_col2:
         st.subheader("市值排名")
@@ -321,15 +320,16 @@ def main():
         # 按市值排序
         sorted_by_cap = sorted(currencies_data, key=lambda x: x['市值'], reverse=True)
         
-        for i, data in enumerate(sorted_by_cap, 1):
-            market_cap = data['市值']
-            st.markdown(f"""
+        st.markdown("".join(
+            f"""
             <div class="comparison-card">
                 <strong>#{i} {data['symbol']}</strong><br>
-                市值: ${market_cap/1e9:.1f}B<br>
+                市值: ${data['市值']/1e9:.1f}B<br>
                 排名: #{data['market_cap_rank']}
             </div>
-            """, unsafe_allow_html=True)
+            """
+            for i, data in enumerate(sorted_by_cap, 1)
+        ), unsafe_allow_html=True)
     
     # 价格走势比较
     st.header("📈 价格走势比较")
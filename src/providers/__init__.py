@@ -1,4 +1,4 @@
 # This file makes the 'providers' directory a Python package.
-from src.providers.base import BaseProvider
+from src.providers.base import BaseProvider, Ticker
 from src.providers.cex import CEXProvider
 # DEXProvider and BridgeProvider will be added here later
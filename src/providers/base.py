@@ -1,5 +1,36 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple
+
+
+class Ticker(NamedTuple):
+    """
+    A compact, immutable ticker snapshot.
+
+    Providers return ccxt-style dicts from `get_ticker`; hot paths such as the
+    arbitrage engine and database writes convert them once with `from_ccxt`
+    and then use plain attribute access.
+    """
+    symbol: str
+    ts: int
+    bid: float
+    ask: float
+    last: float
+    volume: float
+    provider: str
+
+    @classmethod
+    def from_ccxt(cls, data: Dict[str, Any], provider: str) -> 'Ticker':
+        """Builds a Ticker from a ccxt-style ticker dictionary."""
+        return cls(
+            symbol=data.get('symbol') or '',
+            ts=int(data.get('timestamp') or 0),
+            bid=float(data.get('bid') or 0.0),
+            ask=float(data.get('ask') or 0.0),
+            last=float(data.get('last') or 0.0),
+            volume=float(data.get('baseVolume') or data.get('volume') or 0.0),
+            provider=provider,
+        )
+
 
 class BaseProvider(ABC):
     """
@@ -3,14 +3,22 @@ import random
 import time
 import logging
 import os
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Any, Tuple, Optional, FrozenSet
 
 logger = logging.getLogger(__name__)
 
+# Deposit/withdrawal fees rarely change within a session
+FEE_CACHE_TTL_SECONDS = 3600
+
 # --- Global Cache for Mock Data ---
 _mock_data_cache = None
 
+# Random generator for vectorized mock order book levels
+_RNG = np.random.default_rng()
+
 def _get_mock_historical_data():
     """Loads mock historical data from CSV, caching it in memory after the first read."""
     global _mock_data_cache
@@ -26,6 +34,11 @@ def _get_mock_historical_data():
     return _mock_data_cache
 
 
+def _iso8601(timestamp_ms: int) -> str:
+    """Formats a millisecond timestamp like ccxt's `datetime` field (e.g. '2024-01-01T00:00:00.000Z')."""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
 # --- Mock CCXT.PRO Implementation ---
 class MockExchange:
     """Mocks a single ccxt.pro exchange connection."""
@@ -64,10 +77,11 @@ class MockExchange:
         self._last_price *= random.uniform(0.999, 1.001)
         bid = self._last_price * 0.9998
         ask = self._last_price * 1.0002
+        timestamp_ms = int(time.time() * 1000)
         return {
             'symbol': symbol,
-            'timestamp': int(time.time() * 1000),
-            'datetime': time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'timestamp': timestamp_ms,
+            'datetime': _iso8601(timestamp_ms),
             'high': self._last_price * 1.02,
             'low': self._last_price * 0.98,
             'bid': bid,
@@ -86,21 +100,24 @@ class MockExchange:
             if current_index < len(self._historical_data):
                 price = self._historical_data.iloc[current_index]['close']
 
-        bids = sorted([[price - random.uniform(0, 10), random.uniform(0.1, 5)] for _ in range(limit)], key=lambda x: x[0], reverse=True)
-        asks = sorted([[price + random.uniform(0, 10), random.uniform(0.1, 5)] for _ in range(limit)], key=lambda x: x[0])
+        bid_prices = np.sort(price - _RNG.uniform(0, 10, limit))[::-1]
+        ask_prices = np.sort(price + _RNG.uniform(0, 10, limit))
+        bids = np.column_stack([bid_prices, _RNG.uniform(0.1, 5, limit)]).tolist()
+        asks = np.column_stack([ask_prices, _RNG.uniform(0.1, 5, limit)]).tolist()
+        timestamp_ms = int(time.time() * 1000)
         return {
             'bids': bids,
             'asks': asks,
             'symbol': symbol,
-            'timestamp': int(time.time() * 1000),
-            'datetime': time.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'timestamp': timestamp_ms,
+            'datetime': _iso8601(timestamp_ms),
         }
 
     async def close(self):
         """Simulates closing the connection."""
         await asyncio.sleep(0.01)
 
-    def fetch_deposit_withdraw_fees(self, codes=None, params={}):
+    def fetch_deposit_withdraw_fees(self, codes=None, params=None):
         """Simulates fetching deposit and withdrawal fees for multiple assets."""
         mock_fees = {
             'USDT': { 'withdraw': { 'TRX': {'fee': 1.0, 'percentage': False}, 'ERC20': {'fee': 15.0, 'percentage': False}, 'SOL': {'fee': 0.5, 'percentage': False}, 'Polygon': {'fee': 0.8, 'percentage': False} } },
@@ -122,7 +139,7 @@ class MockExchange:
                 del response[asset]['networks']['deposit'][net_to_remove]
         return response
 
-    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1d', limit: int = 100, params={}) -> List[List]:
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1d', limit: int = 100, params=None) -> List[List]:
         """Simulates fetching historical OHLCV data."""
         await asyncio.sleep(0.1)
         if self._historical_data is not None and symbol == 'BTC/USDT' and timeframe == '1d':
@@ -155,6 +172,9 @@ except ImportError:
     IS_MOCK = True
     ccxtpro = MockCCXTPro()
 
+# Resolved ccxt.pro exchange classes, keyed by exchange id
+_EX_CLASS_CACHE: Dict[str, type] = {}
+
 from src.providers.base import BaseProvider
 
 class CEXProvider(BaseProvider):
@@ -162,18 +182,37 @@ class CEXProvider(BaseProvider):
     Connects to Centralized Exchanges (CEX) using ccxt.pro (or a mock version)
     to get real-time data via WebSockets.
     """
-    def __init__(self, name: str, config: Dict = None, force_mock: bool = False):
+    def __init__(self, name: str, config: Dict = None, force_mock: bool = False, session=None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            name: The ccxt exchange id (e.g., 'binance').
+            config: Application config; only its 'api_keys' section is used.
+            force_mock: Use the mock exchange even if ccxt.pro is installed.
+            session: Optional shared aiohttp session for the exchange to use
+                instead of creating its own (see `providers.shared.get_session`).
+            clock: Returns the current time in seconds; used to expire cached fees.
+        """
         super().__init__(name)
         self.exchange_id = name.lower()
+        self._fee_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._clock = clock
+        self._markets: Optional[FrozenSet[str]] = None
         self.is_mock = force_mock or IS_MOCK
         if self.is_mock:
             self.exchange = MockExchange()
             return
 
         try:
-            exchange_class = getattr(ccxtpro, self.exchange_id)
+            exchange_class = _EX_CLASS_CACHE.get(self.exchange_id)
+            if exchange_class is None:
+                exchange_class = _EX_CLASS_CACHE.setdefault(self.exchange_id, getattr(ccxtpro, self.exchange_id))
             api_keys = config.get('api_keys', {}).get(self.exchange_id, {})
-            self.exchange = exchange_class(api_keys if api_keys else {})
+            options = dict(api_keys) if api_keys else {}
+            if session is not None:
+                # ccxt leaves sessions it did not create open when the exchange is closed
+                options['session'] = session
+            self.exchange = exchange_class(options)
         except (AttributeError, TypeError) as e:
             raise ValueError(f"Exchange '{self.exchange_id}' is not supported by ccxt.pro or API config is invalid. Error: {e}")
 
@@ -181,6 +220,29 @@ class CEXProvider(BaseProvider):
         """Fetches the next ticker data update from the WebSocket stream."""
         return await self.exchange.watch_ticker(symbol)
 
+    async def get_markets(self) -> Optional[FrozenSet[str]]:
+        """
+        Returns the set of symbols listed on the exchange, loading it once.
+        Returns None if the market list is unavailable (e.g. the mock exchange).
+        """
+        if self._markets is None:
+            load_markets = getattr(self.exchange, 'load_markets', None)
+            if load_markets is None:
+                return None
+            try:
+                self._markets = frozenset(await load_markets())
+            except Exception as e:
+                logger.warning(f"Could not load markets for {self.name}: {e}")
+                return None
+        return self._markets
+
+    async def filter_symbols(self, symbols: List[str]) -> List[str]:
+        """Returns the subset of `symbols` listed on the exchange, or all of them if unknown."""
+        markets = await self.get_markets()
+        if markets is None:
+            return list(symbols)
+        return [s for s in symbols if s in markets]
+
     async def get_order_book(self, symbol: str, limit: int = 25) -> Dict[str, List]:
         """Fetches the next order book data update from the WebSocket stream."""
         return await self.exchange.watch_order_book(symbol, limit)
@@ -219,12 +281,19 @@ class CEXProvider(BaseProvider):
     async def get_transfer_fees(self, asset: str) -> Dict[str, Any]:
         """
         Fetches deposit and withdrawal fee and network information for a specific asset.
+        Successful results are memoized for FEE_CACHE_TTL_SECONDS.
         """
+        fetched_at, cached = self._fee_cache.get(asset, (0.0, None))
+        if cached is not None and self._clock() - fetched_at < FEE_CACHE_TTL_SECONDS:
+            return cached
+
         try:
             loop = asyncio.get_running_loop()
             all_fees = await loop.run_in_executor(None, self.exchange.fetch_deposit_withdraw_fees, [asset])
             if asset in all_fees and 'networks' in all_fees[asset]:
-                return {'asset': asset, **all_fees[asset]['networks']}
+                fees = {'asset': asset, **all_fees[asset]['networks']}
+                self._fee_cache[asset] = (self._clock(), fees)
+                return fees
             return {'asset': asset, 'error': 'No fee info found for asset.'}
         except Exception as e:
             logger.error(f"Could not fetch transfer fees for {asset} from {self.name}: {e}")
@@ -0,0 +1,39 @@
+"""
+Shared network resources for providers.
+
+By default every ccxt exchange instance opens its own aiohttp session, i.e. its
+own connection pool, DNS cache and TLS context. Handing all exchanges the same
+session lets them reuse sockets and resolver results.
+"""
+import asyncio
+import functools
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import aiohttp
+except ImportError:
+    logger.warning("aiohttp not found. Exchanges will manage their own HTTP sessions.")
+    aiohttp = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_session(loop: asyncio.AbstractEventLoop) -> Optional["aiohttp.ClientSession"]:
+    """
+    Returns the shared aiohttp session bound to the given event loop.
+
+    aiohttp sessions are tied to the loop they were created for, so callers
+    must only use the session from coroutines running on `loop`.
+
+    Args:
+        loop: The event loop the provider coroutines will run on.
+
+    Returns:
+        A cached ClientSession, or None if aiohttp is not installed.
+    """
+    if aiohttp is None:
+        return None
+    connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, loop=loop)
+    return aiohttp.ClientSession(connector=connector)
@@ -0,0 +1,83 @@
+"""
+Process-wide ticker snapshot cache shared by every Streamlit session.
+
+Kept free of Streamlit so the caching rules can be exercised in tests.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Entries older than this are dropped on the next store, whatever TTL readers use.
+DEFAULT_MAX_AGE_SECONDS = 300
+
+
+class TickerSnapshotCache:
+    """
+    Holds the latest ticker list per key as ``{key: (fetched_at, tickers)}``.
+
+    Freshness is decided by the caller's ``ttl`` on every read, so the same
+    snapshot can serve views with different refresh intervals.
+    """
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self._entries: Dict[Hashable, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._max_age = max_age
+        self._clock = clock
+
+    def get(self, key: Hashable, ttl: float) -> Optional[List[Dict[str, Any]]]:
+        """Returns the cached tickers for ``key`` if younger than ``ttl`` seconds, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or self._clock() - entry[0] >= ttl:
+            return None
+        return entry[1]
+
+    def put(self, key: Hashable, tickers: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        """
+        Stores a new snapshot for ``key`` and evicts entries past ``max_age``.
+
+        ``fetched_at`` defaults to now; pass the time the fetch started so the
+        snapshot's age includes how long the fetch took.
+        """
+        now = self._clock()
+        with self._lock:
+            self._entries[key] = (now if fetched_at is None else fetched_at, tickers)
+            for stale in [k for k, (ts, _) in self._entries.items() if now - ts >= self._max_age]:
+                del self._entries[stale]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Iterable[Dict[str, Any]]],
+        ttl: float,
+        on_item: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        on_fresh: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the fresh snapshot for ``key`` or builds a new one from ``fetch()``.
+
+        ``fetch`` may yield tickers incrementally; ``on_item`` is then called
+        with the tickers received so far after each one, e.g. to render a
+        partial table. Only a completely fetched list is stored, after which
+        ``on_fresh`` is called with it exactly once per fetch. The snapshot is
+        dated from the start of the fetch, so a caller polling every ``ttl``
+        seconds gets a new fetch on every poll however long fetching takes.
+        """
+        tickers = self.get(key, ttl)
+        if tickers is not None:
+            return tickers
+        started_at = self._clock()
+        tickers = []
+        for ticker in fetch():
+            tickers.append(ticker)
+            if on_item is not None:
+                on_item(tickers)
+        self.put(key, tickers, fetched_at=started_at)
+        if on_fresh is not None:
+            on_fresh(tickers)
+        return tickers
@@ -1,4 +1,5 @@
 import streamlit as st
+from .dashboard_components import ticker_snapshots
 
 def sidebar_controls():
     """
@@ -53,17 +54,37 @@ def sidebar_controls():
     if 'api_keys' not in st.session_state:
         st.session_state.api_keys = {}
 
-    for ex_id in st.session_state.selected_exchanges:
-        with st.sidebar.expander(f"{ex_id.capitalize()} API密钥"):
-            api_key = st.text_input(f"{ex_id} API Key", key=f"api_key_{ex_id}", value=st.session_state.api_keys.get(ex_id, {}).get('apiKey', ''))
-            api_secret = st.text_input(f"{ex_id} API Secret", type="password", key=f"api_secret_{ex_id}", value=st.session_state.api_keys.get(ex_id, {}).get('secret', ''))
-
-            # Update session state as user types
+    # Exchanges that already have saved keys get no input widgets unless the user
+    # asks to edit them, so reruns do not rebuild 2N text inputs for nothing.
+    saved = [ex_id for ex_id in st.session_state.selected_exchanges if ex_id in st.session_state.api_keys]
+    if saved:
+        st.sidebar.caption(f"已保存密钥: {', '.join(ex_id.capitalize() for ex_id in saved)}")
+        edit_saved = st.sidebar.checkbox("编辑已保存的密钥", key='edit_saved_api_keys')
+    else:
+        edit_saved = False
+    pending = [ex_id for ex_id in st.session_state.selected_exchanges if edit_saved or ex_id not in st.session_state.api_keys]
+
+    submitted = False
+    if pending:
+        # Batch the inputs in a form so typing a key does not rerun the app on every keystroke
+        with st.sidebar.form("api_keys_form"):
+            for ex_id in pending:
+                with st.expander(f"{ex_id.capitalize()} API密钥"):
+                    st.text_input(f"{ex_id} API Key", key=f"api_key_{ex_id}", value=st.session_state.api_keys.get(ex_id, {}).get('apiKey', ''))
+                    st.text_input(f"{ex_id} API Secret", type="password", key=f"api_secret_{ex_id}", value=st.session_state.api_keys.get(ex_id, {}).get('secret', ''))
+            submitted = st.form_submit_button("保存密钥", use_container_width=True)
+
+    if submitted:
+        api_keys = dict(st.session_state.api_keys)
+        for ex_id in pending:
+            api_key = st.session_state.get(f"api_key_{ex_id}")
+            api_secret = st.session_state.get(f"api_secret_{ex_id}")
             if api_key and api_secret:
-                 st.session_state.api_keys[ex_id] = {'apiKey': api_key, 'secret': api_secret}
-            elif ex_id in st.session_state.api_keys:
-                 # Clear keys if fields are emptied
-                 del st.session_state.api_keys[ex_id]
+                api_keys[ex_id] = {'apiKey': api_key, 'secret': api_secret}
+            else:
+                # Clear keys if fields are emptied
+                api_keys.pop(ex_id, None)
+        st.session_state.api_keys = api_keys
 
     st.sidebar.divider()
 
@@ -113,8 +134,10 @@ def sidebar_controls():
     # --- Refresh Control ---
     st.sidebar.subheader("显示控制")
     if st.sidebar.button("🔄 强制刷新所有数据"):
-        # Clearing cached resources will force them to rerun
+        # Clearing cached resources and data will force them to rerun
         st.cache_resource.clear()
+        st.cache_data.clear()
+        ticker_snapshots.clear()
         st.rerun()
 
     st.sidebar.toggle("自动刷新", key='auto_refresh_enabled', value=False)
@@ -138,32 +161,14 @@ def display_warning(message: str):
 
 
 # --- Charting and Utility Functions ---
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import asyncio
 import nest_asyncio
 
 # Apply nest_asyncio to allow running asyncio event loops within Streamlit's loop
 nest_asyncio.apply()
 
-def safe_run_async(coro):
-    """
-    Safely runs an async coroutine in a Streamlit environment.
-    Handles the "cannot run loop while another loop is running" error
-    by leveraging the existing event loop if one is present.
-    """
-    try:
-        # Check if an event loop is already running
-        loop = asyncio.get_running_loop()
-        return loop.run_until_complete(coro)
-    except RuntimeError:
-        # If no loop is running, create a new one
-        return asyncio.run(coro)
-    except Exception as e:
-        st.error(f"An unexpected error occurred during an async operation: {e}")
-        return None
-
-
 def validate_symbol(symbol: str) -> bool:
     """Validates that the symbol is not empty and has a valid format (e.g., 'BTC/USDT')."""
     if not symbol or '/' not in symbol or len(symbol.split('/')) != 2:
@@ -172,6 +177,13 @@ def validate_symbol(symbol: str) -> bool:
     return True
 
 
+def order_book_levels(levels: list) -> np.ndarray:
+    """Converts [price, volume, ...] order book levels into an (N, 2) float64 array."""
+    if not len(levels):
+        return np.empty((0, 2))
+    return np.asarray(levels, dtype=np.float64).reshape(len(levels), -1)[:, :2]
+
+
 def create_depth_chart(order_book: dict) -> go.Figure:
     """Creates a Plotly order book depth chart."""
     if not order_book or 'bids' not in order_book or 'asks' not in order_book:
@@ -179,8 +191,8 @@ def create_depth_chart(order_book: dict) -> go.Figure:
         fig.update_layout(title_text="市场深度 - 无数据", height=300)
         return fig
 
-    bids = pd.DataFrame(order_book.get('bids', []), columns=['price', 'volume']).astype(float)
-    asks = pd.DataFrame(order_book.get('asks', []), columns=['price', 'volume']).astype(float)
+    bids = pd.DataFrame(order_book_levels(order_book.get('bids', [])), columns=['price', 'volume'])
+    asks = pd.DataFrame(order_book_levels(order_book.get('asks', [])), columns=['price', 'volume'])
 
     bids = bids.sort_values('price', ascending=False)
     asks = asks.sort_values('price', ascending=True)
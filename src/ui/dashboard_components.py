@@ -6,16 +6,115 @@ import streamlit as st
 import pandas as pd
 import asyncio
 from typing import List, Dict, Any
-from ..providers.base import BaseProvider
+from ..providers.base import BaseProvider, Ticker
 from ..providers.cex import CEXProvider
 from ..providers.free_api import free_api_provider
+from ..ticker_cache import TickerSnapshotCache
+from ..utils.async_utils import iterate_async, safe_run_async, submit_async
+
+
+TICKER_CACHE_TTL_SECONDS = 10
+TICKER_TIMEOUT_SECONDS = 5
+# 刷新触发到开始获取之间还要执行页面其他部分，TTL 略短于刷新间隔才能保证每次刷新都重新获取
+TICKER_TTL_MARGIN_SECONDS = 1
+
+
+async def _fetch_ticker(provider: CEXProvider, symbol: str, timeout: float):
+    """获取单个行情，超时或出错时返回 None，避免慢交易所拖住整批请求。"""
+    try:
+        ticker = await asyncio.wait_for(provider.get_ticker(symbol), timeout)
+    except Exception:
+        return None
+    if isinstance(ticker, dict) and ticker.get('last') is not None:
+        return {**ticker, 'provider': provider.name}
+    return None
+
+
+async def stream_tickers(providers: List[CEXProvider], symbols, timeout: float = TICKER_TIMEOUT_SECONDS):
+    """并发请求所有 (交易对, 交易所) 的行情，按完成顺序逐条产出有效结果。"""
+    # 只请求交易所实际上线的交易对，避免对未上线交易对发出注定失败的请求
+    listed = await asyncio.gather(*(provider.filter_symbols(symbols) for provider in providers))
+    tasks = [
+        _fetch_ticker(provider, symbol, timeout)
+        for provider, provider_symbols in zip(providers, listed)
+        for symbol in provider_symbols
+    ]
+    for next_done in asyncio.as_completed(tasks):
+        ticker = await next_done
+        if ticker is not None:
+            yield ticker
+
+
+# 进程级行情快照，所有会话共享；新鲜度按调用方的 TTL 判断
+ticker_snapshots = TickerSnapshotCache()
+
+
+def _ticker_cache_key(cex_providers: List[CEXProvider], symbols) -> tuple:
+    return tuple((p.name, p.is_mock) for p in cex_providers), tuple(symbols)
+
+
+def _ticker_ttl() -> float:
+    """快照有效期略短于自动刷新间隔，每次刷新都拿到新行情，间隔内的 rerun 复用快照。"""
+    interval = st.session_state.get('auto_refresh_interval', TICKER_CACHE_TTL_SECONDS)
+    return max(interval - TICKER_TTL_MARGIN_SECONDS, 0)
+
+
+def get_cached_tickers(cex_providers: List[CEXProvider], symbols, db_manager=None, on_item=None) -> List[Dict[str, Any]]:
+    """
+    返回当前行情快照，是所有视图读取行情的唯一入口：实时价格表与套利扫描共用
+    同一份 `ticker_snapshots` 缓存，避免在 TTL 内重复请求交易所。
+
+    快照过期时由本次调用重新获取：`on_item` 会随每条新行情收到已获取的列表，
+    传入 `db_manager` 时新快照在后台写入数据库，因此无论哪个视图先触发获取都会保存。
+    返回的每条行情附带 'provider' 字段。
+    """
+    save = (lambda tickers: _save_tickers_in_background(db_manager, tickers)) if db_manager is not None else None
+    return ticker_snapshots.get_or_fetch(
+        _ticker_cache_key(cex_providers, symbols),
+        lambda: iterate_async(stream_tickers(cex_providers, symbols)),
+        _ticker_ttl(),
+        on_item=on_item,
+        on_fresh=save,
+    )
 
 
-def render_cex_price_comparison(providers: List[BaseProvider], price_placeholder):
-    """渲染CEX价格对比组件"""
+def _render_price_pivot(price_placeholder, tickers: List[Dict[str, Any]]):
+    price_df = pd.DataFrame.from_records(
+        ((t['symbol'], t['provider'], t['last']) for t in tickers),
+        columns=['symbol', 'provider', 'price']
+    )
+    pivot_df = price_df.pivot(index='symbol', columns='provider', values='price')
+    # 由前端按列格式化，价格保持为 float64，避免逐单元格调用 Python 格式化函数
+    price_format = st.column_config.NumberColumn(format="%.4f")
+    price_placeholder.dataframe(
+        pivot_df,
+        column_config={provider: price_format for provider in pivot_df.columns},
+        use_container_width=True
+    )
+
+
+def _save_tickers_in_background(db_manager, tickers: List[Dict[str, Any]]):
+    """在共享事件循环上异步写入行情，不阻塞页面渲染；结果在下次渲染时检查。"""
+    if not tickers:
+        return
+    records = [Ticker.from_ccxt(t, provider=t['provider']) for t in tickers]
+    st.session_state['ticker_save_future'] = submit_async(db_manager.save_ticker_data(records))
+
+
+def _report_ticker_save():
+    """若上一次后台写入已失败，用 toast 提示用户。"""
+    future = st.session_state.get('ticker_save_future')
+    if future is None or not future.done():
+        return
+    del st.session_state['ticker_save_future']
+    if future.exception() is not None:
+        st.toast(f"行情数据保存失败: {future.exception()}", icon="⚠️")
+
+
+def render_cex_price_comparison(providers: List[BaseProvider], price_placeholder, db_manager=None):
+    """渲染CEX价格对比组件；传入 `db_manager` 时在后台保存新获取的行情。"""
+    _report_ticker_save()
     with st.spinner("正在获取CEX交易所最新价格..."):
-        tasks = []
-        provider_symbol_pairs = []
         cex_providers = [p for p in providers if isinstance(p, CEXProvider)]
         symbols = st.session_state.get('selected_symbols', [])
 
@@ -27,23 +126,14 @@ def render_cex_price_comparison(providers: List[BaseProvider], price_placeholder
             price_placeholder.warning("请在侧边栏选择至少一个交易对。")
             return
 
-        for symbol in symbols:
-            for provider in cex_providers:
-                tasks.append(provider.get_ticker(symbol))
-                provider_symbol_pairs.append((provider.name, symbol))
-
-        from ..app import safe_run_async
-        all_tickers = safe_run_async(asyncio.gather(*tasks, return_exceptions=True))
-
-        processed_tickers = [
-            {'symbol': t['symbol'], 'provider': provider_symbol_pairs[i][0], 'price': t['last']}
-            for i, t in enumerate(all_tickers) if isinstance(t, dict) and t.get('last') is not None
-        ]
+        # 快照过期时边接收边渲染，无需等待最慢的交易所
+        all_tickers = get_cached_tickers(
+            cex_providers, symbols, db_manager,
+            on_item=lambda tickers: _render_price_pivot(price_placeholder, tickers),
+        )
 
-        if processed_tickers:
-            price_df = pd.DataFrame(processed_tickers)
-            pivot_df = price_df.pivot(index='symbol', columns='provider', values='price')
-            price_placeholder.dataframe(pivot_df.style.format("{:.4f}"), use_container_width=True)
+        if all_tickers:
+            _render_price_pivot(price_placeholder, all_tickers)
         else:
             price_placeholder.warning("未能获取任何有效的CEX价格数据。")
 
@@ -92,7 +182,6 @@ def _render_free_api_data(selected_symbols_free):
             selected_api = enabled_apis[0] if enabled_apis else 'coingecko'
             return await free_api_provider.get_exchange_prices_from_api(selected_symbols_free, selected_api)
 
-        from ..app import safe_run_async
         free_data = safe_run_async(fetch_free_data())
 
         if not free_data:
@@ -0,0 +1,106 @@
+"""
+Async helpers for running coroutines from Streamlit scripts.
+
+All coroutines run on one process-wide event loop that lives in a background
+thread. Loop-bound resources such as the database connection and the shared
+aiohttp session therefore survive reruns, and every Streamlit script thread
+can submit work to the loop safely.
+"""
+import asyncio
+import concurrent.futures
+import threading
+
+import streamlit as st
+
+
+def create_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Creates a new event loop, preferring uvloop when it is installed.
+
+    Only use this for standalone loops that do not need nest_asyncio:
+    nest_asyncio cannot patch uvloop, so uvloop must not be installed as the
+    global event loop policy.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the shared event loop, starting it in a daemon thread on first use.
+
+    This is a module-level singleton rather than an `st.cache_resource`:
+    clearing Streamlit's resource cache must not start a second loop and
+    orphan the running one together with the DB connection and HTTP session
+    bound to it.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = create_event_loop()
+            threading.Thread(target=_loop.run_forever, name="shared-event-loop", daemon=True).start()
+    return _loop
+
+
+def run_async(coro):
+    """Runs a coroutine on the shared event loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+
+def submit_async(coro) -> concurrent.futures.Future:
+    """
+    Schedules a coroutine on the shared event loop without waiting for it.
+
+    Use this for fire-and-forget work such as database writes; the returned
+    future can be checked on a later rerun to surface errors.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+async def _anext(agen, default):
+    try:
+        return await agen.__anext__()
+    except StopAsyncIteration:
+        return default
+
+
+def iterate_async(agen):
+    """
+    Iterates an async generator on the shared event loop.
+
+    Items are yielded in the calling thread as soon as the loop produces them,
+    so a Streamlit script can render partial results while the rest are still
+    in flight.
+    """
+    done = object()
+    try:
+        while (item := run_async(_anext(agen, done))) is not done:
+            yield item
+    finally:
+        run_async(agen.aclose())
+
+
+async def gather(*aws, return_exceptions: bool = False):
+    """
+    Coroutine wrapper around `asyncio.gather`.
+
+    `asyncio.gather` returns a future bound to the calling thread's loop, so
+    its result cannot be handed to `run_async`; this wrapper can.
+    """
+    return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+
+def safe_run_async(coro):
+    """Like `run_async`, but reports loop errors in the UI and returns None."""
+    try:
+        return run_async(coro)
+    except RuntimeError as e:
+        st.error(f"异步操作失败: {e}")
+        return None
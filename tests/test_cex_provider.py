@@ -1,12 +1,13 @@
 import pytest
 import pandas as pd
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 import sys
 import os
 
 # Add the parent directory to Python path so 'src' module can be found
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.providers import cex
 from src.providers.cex import CEXProvider
 
 # Sample OHLCV data that the mock exchange will return
@@ -131,3 +132,51 @@ async def test_get_historical_data_invalid_cache(provider_with_mock_exchange, tm
     assert df_from_cache.shape[0] == 2
     assert 'high' in df_from_cache.columns # Check that the columns are now correct
     assert df_from_cache['volume'].iloc[0] == 1000.0
+
+@pytest.mark.asyncio
+async def test_get_transfer_fees_is_memoized(mock_exchange):
+    """
+    Test that transfer fees are fetched once and served from the cache until
+    the TTL expires.
+    """
+    # --- Arrange ---
+    fees_response = {'USDT': {'networks': {'withdraw': {'TRX': {'fee': 1.0}}, 'deposit': {}}}}
+    now = [1000.0]
+    provider = CEXProvider(name="TestEx", force_mock=True, clock=lambda: now[0])
+    provider.exchange = mock_exchange
+    provider.exchange.fetch_deposit_withdraw_fees = MagicMock(return_value=fees_response)
+
+    # --- Act ---
+    first = await provider.get_transfer_fees('USDT')
+    second = await provider.get_transfer_fees('USDT')
+    now[0] += cex.FEE_CACHE_TTL_SECONDS + 1
+    third = await provider.get_transfer_fees('USDT')
+
+    # --- Assert ---
+    assert first == second == third
+    assert first['withdraw']['TRX']['fee'] == 1.0
+    assert provider.exchange.fetch_deposit_withdraw_fees.call_count == 2
+
+@pytest.mark.asyncio
+async def test_filter_symbols_uses_cached_markets(provider_with_mock_exchange):
+    """
+    Test that symbols not listed on the exchange are dropped and that the
+    market list is loaded only once.
+    """
+    # --- Arrange ---
+    provider_with_mock_exchange.exchange.load_markets = AsyncMock(return_value={'BTC/USDT': {}, 'ETH/USDT': {}})
+
+    # --- Act ---
+    first = await provider_with_mock_exchange.filter_symbols(['BTC/USDT', 'WETH/USDC', 'ETH/USDT'])
+    second = await provider_with_mock_exchange.filter_symbols(['WETH/USDC'])
+
+    # --- Assert ---
+    assert first == ['BTC/USDT', 'ETH/USDT']
+    assert second == []
+    provider_with_mock_exchange.exchange.load_markets.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_filter_symbols_keeps_all_without_markets():
+    """Test that the mock exchange, which has no market list, keeps every symbol."""
+    provider = CEXProvider(name="TestEx", force_mock=True)
+    assert await provider.filter_symbols(['BTC/USDT', 'WETH/USDC']) == ['BTC/USDT', 'WETH/USDC']
@@ -0,0 +1,62 @@
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to Python path so 'src' module can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db import DatabaseManager, TICKER_COLUMNS
+from src.providers.base import Ticker
+
+@pytest.fixture
+async def db_manager(tmp_path):
+    """Fixture to create an initialized DatabaseManager on a temporary file."""
+    async with DatabaseManager(str(tmp_path / "data" / "test.db")) as manager:
+        await manager.init_db()
+        yield manager
+
+@pytest.mark.asyncio
+async def test_save_and_query_round_trip(db_manager):
+    """
+    Test that both record formats accepted by save_ticker_data are stored and
+    returned by query_historical_data with the expected columns and dtypes.
+    """
+    # --- Arrange ---
+    ticker = Ticker(
+        symbol="BTC/USDT", ts=1704067200000, bid=42000.0, ask=42010.0,
+        last=42005.0, volume=12.5, provider="binance"
+    )  # 2024-01-01T00:00:00
+    legacy = {
+        'timestamp': datetime(2024, 1, 1, 0, 0, 30, 250000),
+        'provider_name': 'okx',
+        'symbol': 'BTC/USDT',
+        'price': 42007.0,
+        'bid': 42001.0,
+        'ask': 42012.0,
+        'volume': 3.0,
+    }
+
+    # --- Act ---
+    await db_manager.save_ticker_data([ticker, legacy])
+    df = await db_manager.query_historical_data("BTC/USDT", datetime(2023, 12, 31), datetime(2024, 1, 2))
+
+    # --- Assert ---
+    assert list(df.columns) == list(TICKER_COLUMNS)
+    assert str(df['timestamp'].dtype).startswith('datetime64')
+    assert df['provider_name'].tolist() == ['binance', 'okx']
+    assert df['price'].tolist() == [42005.0, 42007.0]
+    assert df['volume'].tolist() == [12.5, 3.0]
+    assert df['timestamp'].iloc[0] == datetime(2024, 1, 1)
+    assert df['timestamp'].iloc[1] == datetime(2024, 1, 1, 0, 0, 30, 250000)
+
+@pytest.mark.asyncio
+async def test_query_outside_range_returns_empty_frame(db_manager):
+    """Test that a query matching no rows returns an empty DataFrame."""
+    await db_manager.save_ticker_data([
+        Ticker(symbol="BTC/USDT", ts=1704067200000, bid=1.0, ask=1.0, last=1.0, volume=1.0, provider="binance")
+    ])
+
+    df = await db_manager.query_historical_data("ETH/USDT", datetime(2023, 12, 31), datetime(2024, 1, 2))
+
+    assert df.empty
@@ -22,6 +22,12 @@ class MockProvider:
         # Return the predefined ticker data for the given symbol
         return self._ticker_data.get(symbol)
 
+class SlowMockProvider(MockProvider):
+    """A mock provider whose ticker arrives only after a long delay."""
+    async def get_ticker(self, symbol: str):
+        await asyncio.sleep(5)
+        return self._ticker_data.get(symbol)
+
 # --- Test Cases ---
 
 @pytest.mark.asyncio
@@ -120,3 +126,141 @@ async def test_find_opportunities_no_profit():
     opportunities = await engine.find_opportunities(symbols=["BTC/USDT"])
 
     assert len(opportunities) == 0
+
+
+@pytest.mark.asyncio
+async def test_find_opportunities_multiple_providers():
+    """
+    Tests that every profitable (buy, sell) pair across several providers is
+    reported, in buy-major order, and that unprofitable pairs are skipped.
+    """
+    mock_providers = [
+        MockProvider(name="ExchangeA", ticker_data={"BTC/USDT": {"ask": 50000.0, "bid": 49990.0}}),
+        MockProvider(name="ExchangeB", ticker_data={"BTC/USDT": {"ask": 50600.0, "bid": 50500.0}}),
+        MockProvider(name="ExchangeC", ticker_data={"BTC/USDT": {"ask": 50100.0, "bid": 50700.0}}),
+    ]
+    mock_config = {'threshold': 0.1, 'fees': {'default': {'taker': 0.001}}}
+
+    engine = ArbitrageEngine(providers=mock_providers, config=mock_config)
+    opportunities = await engine.find_opportunities(symbols=["BTC/USDT"])
+
+    # ExchangeC's own ask is below its bid, but a provider is never paired with itself.
+    assert [(op['buy_at'], op['sell_at']) for op in opportunities] == [
+        ('ExchangeA', 'ExchangeB'),
+        ('ExchangeA', 'ExchangeC'),
+        ('ExchangeC', 'ExchangeB'),
+    ]
+    assert opportunities[1]['net_profit_usd'] == pytest.approx(599.3)
+    assert opportunities[1]['profit_percentage'] == pytest.approx(1.1974, abs=1e-4)
+
+
+def test_scan_kernels_agree():
+    """
+    Tests that the loop kernel (compiled by Numba when available) and the
+    NumPy fallback produce the same mask and profit matrix.
+    """
+    import numpy as np
+    from src.engine_kernels import _scan_loops, _scan_numpy
+
+    rng = np.random.default_rng(42)
+    mid = rng.uniform(100, 50000, size=6)
+    asks = mid * rng.uniform(0.99, 1.01, size=6)
+    bids = mid * rng.uniform(0.99, 1.01, size=6)
+    taker = rng.uniform(0.0, 0.003, size=6)
+    withdrawal = rng.uniform(0.0, 0.001, size=6)
+
+    loop_mask, loop_pct = _scan_loops(asks, bids, taker, withdrawal, 0.1)
+    numpy_mask, numpy_pct = _scan_numpy(asks, bids, taker, withdrawal, 0.1)
+
+    assert (loop_mask == numpy_mask).all()
+    assert np.allclose(loop_pct, numpy_pct)
+
+
+@pytest.mark.asyncio
+async def test_find_opportunities_top_k_keeps_best_pair():
+    """
+    Tests that limiting the scan to the top-k legs still reports the best
+    opportunity, and that exhaustive mode reports every profitable pair.
+    """
+    mock_providers = [
+        MockProvider(name="ExchangeA", ticker_data={"BTC/USDT": {"ask": 50000.0, "bid": 49990.0}}),
+        MockProvider(name="ExchangeB", ticker_data={"BTC/USDT": {"ask": 50600.0, "bid": 50500.0}}),
+        MockProvider(name="ExchangeC", ticker_data={"BTC/USDT": {"ask": 50100.0, "bid": 50700.0}}),
+        MockProvider(name="ExchangeD", ticker_data={"BTC/USDT": {"ask": 50800.0, "bid": 50200.0}}),
+    ]
+    mock_config = {'threshold': 0.1, 'fees': {'default': {'taker': 0.001}}, 'top_k': 2}
+
+    engine = ArbitrageEngine(providers=mock_providers, config=mock_config)
+    best_only = await engine.find_opportunities(symbols=["BTC/USDT"])
+    everything = await engine.find_opportunities(symbols=["BTC/USDT"], exhaustive=True)
+
+    # ExchangeD is neither a top-2 buy leg nor a top-2 sell leg, so A->D is pruned
+    assert [op['id'] for op in best_only] == [
+        'BTC/USDT-ExchangeA-ExchangeB', 'BTC/USDT-ExchangeA-ExchangeC', 'BTC/USDT-ExchangeC-ExchangeB'
+    ]
+    assert len(everything) == 4
+    assert max(everything, key=lambda op: op['profit_percentage'])['id'] == 'BTC/USDT-ExchangeA-ExchangeC'
+
+
+@pytest.mark.asyncio
+async def test_find_opportunities_top_k_when_one_provider_leads_both_sides():
+    """
+    Tests that the best pair is still found when the cheapest buyer is also
+    the richest seller, even if the config asks for top_k=1.
+    """
+    mock_providers = [
+        MockProvider(name="ExchangeA", ticker_data={"BTC/USDT": {"ask": 100.0, "bid": 99.0}}),
+        MockProvider(name="ExchangeB", ticker_data={"BTC/USDT": {"ask": 101.0, "bid": 100.0}}),
+        MockProvider(name="ExchangeC", ticker_data={"BTC/USDT": {"ask": 95.0, "bid": 110.0}}),
+    ]
+    mock_config = {'threshold': 0.1, 'fees': {'default': {'taker': 0.001}}, 'top_k': 1}
+
+    engine = ArbitrageEngine(providers=mock_providers, config=mock_config)
+    best_only = await engine.find_opportunities(symbols=["BTC/USDT"])
+    everything = await engine.find_opportunities(symbols=["BTC/USDT"], exhaustive=True)
+
+    best = max(everything, key=lambda op: op['profit_percentage'])
+    assert best_only
+    assert max(best_only, key=lambda op: op['profit_percentage']) == best
+
+
+@pytest.mark.asyncio
+async def test_find_opportunities_skips_providers_past_timeout():
+    """
+    Tests that a provider which does not answer within the ticker timeout is
+    left out of the scan instead of delaying it.
+    """
+    mock_providers = [
+        MockProvider(name="ExchangeA", ticker_data={"BTC/USDT": {"ask": 50000.0, "bid": 49990.0}}),
+        MockProvider(name="ExchangeB", ticker_data={"BTC/USDT": {"ask": 50600.0, "bid": 50500.0}}),
+        SlowMockProvider(name="ExchangeC", ticker_data={"BTC/USDT": {"ask": 40000.0, "bid": 60000.0}}),
+    ]
+    mock_config = {'threshold': 0.1, 'fees': {'default': {'taker': 0.001}}, 'ticker_timeout': 0.2}
+
+    engine = ArbitrageEngine(providers=mock_providers, config=mock_config)
+    opportunities = await engine.find_opportunities(symbols=["BTC/USDT"])
+
+    assert [op['id'] for op in opportunities] == ['BTC/USDT-ExchangeA-ExchangeB']
+
+
+@pytest.mark.asyncio
+async def test_scan_tickers_matches_find_opportunities():
+    """
+    Tests that scanning a pre-fetched ticker snapshot gives the same result as
+    letting the engine fetch the tickers itself, without calling any provider.
+    """
+    ticker_data = {
+        "ExchangeA": {"symbol": "BTC/USDT", "ask": 50000.0, "bid": 49990.0},
+        "ExchangeB": {"symbol": "BTC/USDT", "ask": 50600.0, "bid": 50500.0},
+        "ExchangeC": {"symbol": "BTC/USDT", "ask": 50100.0, "bid": 50700.0},
+    }
+    mock_providers = [MockProvider(name=name, ticker_data={"BTC/USDT": data}) for name, data in ticker_data.items()]
+    mock_config = {'threshold': 0.1, 'fees': {'default': {'taker': 0.001}}}
+    engine = ArbitrageEngine(providers=mock_providers, config=mock_config)
+
+    # Snapshot in a different order, with a ticker from a provider the engine does not know
+    snapshot = [{**data, 'provider': name} for name, data in reversed(ticker_data.items())]
+    snapshot.append({"symbol": "BTC/USDT", "ask": 1.0, "bid": 1.0, "provider": "Unknown"})
+
+    expected = await engine.find_opportunities(symbols=["BTC/USDT"])
+    assert engine.scan_tickers(["BTC/USDT"], snapshot) == expected
@@ -0,0 +1,120 @@
+import sys
+import os
+
+# Add the parent directory to Python path so 'src' module can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ticker_cache import TickerSnapshotCache
+
+KEY = ((("binance", True), ("okx", True)), ("BTC/USDT",))
+TICKERS = [
+    {'symbol': 'BTC/USDT', 'last': 50000.0, 'provider': 'binance'},
+    {'symbol': 'BTC/USDT', 'last': 50010.0, 'provider': 'okx'},
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class CountingFetch:
+    def __init__(self, tickers, clock=None, duration=0.0):
+        self.tickers = tickers
+        self.calls = 0
+        self.clock = clock
+        self.duration = duration
+
+    def __call__(self):
+        self.calls += 1
+        if self.clock is not None:
+            self.clock.now += self.duration
+        yield from self.tickers
+
+def test_get_or_fetch_reuses_snapshot_within_ttl():
+    """
+    Test that repeated reads within the TTL return the stored snapshot without
+    fetching again, and that a read after the TTL triggers a new fetch.
+    """
+    # --- Arrange ---
+    clock = FakeClock()
+    cache = TickerSnapshotCache(clock=clock)
+    fetch = CountingFetch(TICKERS)
+
+    # --- Act & Assert ---
+    assert cache.get_or_fetch(KEY, fetch, ttl=10) == TICKERS
+    clock.now += 9.9
+    assert cache.get_or_fetch(KEY, fetch, ttl=10) == TICKERS
+    assert fetch.calls == 1
+
+    clock.now += 0.1
+    assert cache.get_or_fetch(KEY, fetch, ttl=10) == TICKERS
+    assert fetch.calls == 2
+
+def test_slow_fetch_still_refreshes_on_every_tick():
+    """
+    Test that a caller polling every `ttl` seconds fetches on every poll even
+    when the fetch itself takes time, i.e. the snapshot is dated from the
+    start of the fetch rather than its end.
+    """
+    # --- Arrange ---
+    clock = FakeClock()
+    cache = TickerSnapshotCache(clock=clock)
+    fetch = CountingFetch(TICKERS, clock=clock, duration=0.5)
+    tick_at = clock.now
+
+    # --- Act ---
+    for _ in range(6):
+        clock.now = tick_at
+        cache.get_or_fetch(KEY, fetch, ttl=10)
+        tick_at += 10
+
+    # --- Assert ---
+    assert fetch.calls == 6
+
+def test_get_or_fetch_reports_partial_results_while_streaming():
+    """Test that on_item sees the growing ticker list during a fetch."""
+    cache = TickerSnapshotCache()
+    seen = []
+
+    cache.get_or_fetch(KEY, CountingFetch(TICKERS), ttl=10, on_item=lambda tickers: seen.append(len(tickers)))
+
+    assert seen == [1, 2]
+    assert cache.get(KEY, ttl=10) == TICKERS
+
+def test_put_evicts_entries_past_max_age():
+    """Test that storing a snapshot drops entries older than max_age."""
+    clock = FakeClock()
+    cache = TickerSnapshotCache(max_age=60, clock=clock)
+    cache.put("old", TICKERS)
+
+    clock.now += 60
+    cache.put(KEY, TICKERS)
+
+    assert cache.get("old", ttl=float("inf")) is None
+    assert cache.get(KEY, ttl=10) == TICKERS
+
+def test_header_scan_then_price_table_saves_snapshot_once():
+    """
+    Test the dashboard order of reads: the header scan fetches the snapshot
+    first, then the price table reads it. The fetch that builds the snapshot
+    must trigger the save even though the price table never fetches itself.
+    """
+    # --- Arrange ---
+    cache = TickerSnapshotCache()
+    fetch = CountingFetch(TICKERS)
+    saved = []
+    rendered = []
+
+    # --- Act ---
+    header_tickers = cache.get_or_fetch(KEY, fetch, ttl=10, on_fresh=saved.append)
+    table_tickers = cache.get_or_fetch(
+        KEY, fetch, ttl=10, on_item=rendered.append, on_fresh=saved.append
+    )
+
+    # --- Assert ---
+    assert fetch.calls == 1
+    assert saved == [TICKERS]
+    assert rendered == []
+    assert header_tickers is table_tickers